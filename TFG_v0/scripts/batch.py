@@ -1,12 +1,12 @@
 # scripts/batch_fit.py
 from pathlib import Path
 import pandas as pd
-import skrf as rf
 
 from rich.console import Console
 from rich.table import Table
 
 from tfg_v0.config import load_config
+from tfg_v0.io.touchstone import load_s2p_cached
 from tfg_v0.model import fit_equivalent  # usa tu función actual
 # Si tu CLI calcula RMSE, puedes importarlas y añadir métricas
 
@@ -30,7 +30,7 @@ def main(
 
     for fpath in files:
         try:
-            ntw = rf.Network(str(fpath))
+            ntw = load_s2p_cached(fpath)
             res = fit_equivalent(ntw, cfg)  # DataFrame 1x3 con R,L,C
             res_csv = out_dir / f"{fpath.stem}_rlc.csv"
             res.to_csv(res_csv, index=False)
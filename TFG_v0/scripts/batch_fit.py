@@ -1,9 +1,9 @@
 # scripts/batch_fit.py
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import math
+import os
 import numpy as np
-import pandas as pd
-import skrf as rf
 import sys
 
 from rich.console import Console
@@ -11,7 +11,9 @@ from rich.table import Table
 from rich.progress import Progress, BarColumn, TimeElapsedColumn, TimeRemainingColumn, SpinnerColumn, TextColumn
 
 from tfg_v0.config import load_config
+from tfg_v0.io.touchstone import load_s2p_cached
 from tfg_v0.model import fit_equivalent  # Debe existir tfg_v0/model.py con fit_equivalent(...)
+from tfg_v0.modeling.rlc_fit import fit_equivalent_batch
 
 # Plotting opcional (usa tu módulo si existe; si no, fallback interno)
 _HAS_PLOTTING = False
@@ -22,8 +24,10 @@ except Exception:
     # Fallback simple con matplotlib si no existe tfg_v0.plotting.compare
     try:
         import matplotlib.pyplot as plt
-        def _db(x): return 20*np.log10(np.abs(x))
-        def _phase_deg(x): return np.unwrap(np.angle(x))*180/np.pi
+        # 20·log10(|x|) = (10/ln10)·ln(re²+im²): evita el sqrt de abs y el
+        # pase extra de log10 (una sola pasada de memoria)
+        def _db(x): return (10.0/np.log(10.0)) * np.log(x.real*x.real + x.imag*x.imag)
+        def _phase_deg(x): return _unwrap_vec(np.angle(x))*180/np.pi
         def plot_s11_meas_vs_model(f_hz, s11_meas, s11_model, outdir: Path, stem: str):
             outdir.mkdir(parents=True, exist_ok=True)
             # Magnitud
@@ -47,32 +51,196 @@ except Exception:
         _HAS_PLOTTING = False
 
 # -------- utils ----------
-def gamma_rlc_series(f_hz: np.ndarray, z0: np.ndarray | float, R: float, L: float, C: float) -> np.ndarray:
-    w = 2 * np.pi * f_hz
-    Z = R + 1j * (w * L - 1.0 / (w * C))
+_TWO_PI = 2.0 * np.pi
+
+def gamma_rlc_series(f_hz: np.ndarray, z0: np.ndarray | float, R: float, L: float, C: float,
+                     out: np.ndarray | None = None, scratch: np.ndarray | None = None) -> np.ndarray:
+    """Γ(f) del RLC serie, calculada con ufuncs in-place.
+
+    `out` y `scratch` (complex128, misma longitud que f_hz) permiten
+    reutilizar los buffers entre llamadas del lote: la cadena directa
+    R + 1j*(wL − 1/(wC)) seguida de (Z−z0)/(Z+z0) asigna ~6 temporales
+    complejos por llamada; aquí no se asigna ninguno si se pasan buffers.
+
+    Se espera entrada C-contigua (float64/complex128): así las ufuncs usan
+    el camino contiguo vectorizado.
+    """
+    n = f_hz.shape[0]
+    if out is None:
+        out = np.empty(n, np.complex128)
+    if scratch is None:
+        scratch = np.empty(n, np.complex128)
     z0_arr = np.asarray(z0)
     if getattr(z0_arr, "ndim", 1) > 1:  # (N,2) → puerto 1
         z0_arr = z0_arr[:, 0]
-    return (Z - z0_arr) / (Z + z0_arr)
+
+    # Vistas float64 de scratch para los pasos reales intermedios
+    w = scratch.real
+    x = scratch.imag
+    np.multiply(f_hz, _TWO_PI, out=w)        # w = 2πf
+    np.divide(1.0 / C, w, out=x)             # x = 1/(wC)  (una inversa escalar)
+    np.multiply(w, L, out=w)                 # w = wL
+    np.subtract(w, x, out=x)                 # x = wL − 1/(wC)
+    out.real[...] = R
+    out.imag[...] = x                        # out = Z
+    np.subtract(out, z0_arr, out=scratch)    # scratch = Z − z0
+    np.add(out, z0_arr, out=out)             # out = Z + z0
+    np.divide(scratch, out, out=out)         # out = Γ
+    return out
+
+def gamma_rlc_series_2d(f_hz: np.ndarray, z0: np.ndarray, R: np.ndarray, L: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Versión broadcast: todas las Γ del lote en una sola expresión NumPy.
+    f_hz: (N_freq,) rejilla común; z0: (N_files, N_freq); R/L/C: (N_files,)."""
+    w = _TWO_PI * f_hz[None, :]
+    inv_w = 1.0 / w  # un solo divide (1,N); el resto son multiplicaciones
+    Z = R[:, None] + 1j * (w * L[:, None] - inv_w * (1.0 / C)[:, None])
+    return (Z - z0) / (Z + z0)
+
+_DB_SCALE = 10.0 / np.log(10.0)  # 20·log10(|x|) ≡ _DB_SCALE·ln(re²+im²)
+
+def _db_fused(x: np.ndarray) -> np.ndarray:
+    """Magnitud en dB sin sqrt ni log10: una pasada con ln(re²+im²)."""
+    return _DB_SCALE * np.log(x.real * x.real + x.imag * x.imag)
 
 def rmse_db(a: np.ndarray, b: np.ndarray) -> float:
-    A = 20 * np.log10(np.abs(a)); B = 20 * np.log10(np.abs(b))
+    A = _db_fused(a); B = _db_fused(b)
     return float(np.sqrt(np.mean((A - B) ** 2)))
 
+def _unwrap_vec(ph: np.ndarray) -> np.ndarray:
+    """Unwrap sin ramas: saltos corregidos con round(Δ/2π) en ufuncs puros
+    (np.unwrap recorre el array con un bucle comparativo salto a salto).
+    Opera sobre el último eje, así sirve también para la matriz del lote."""
+    d = np.diff(ph, axis=-1)
+    d -= _TWO_PI * np.round(d * (1.0 / _TWO_PI))
+    out = np.empty_like(ph)
+    out[..., :1] = ph[..., :1]
+    np.cumsum(d, axis=-1, out=out[..., 1:])
+    out[..., 1:] += ph[..., :1]
+    return out
+
 def rmse_phase_deg(a: np.ndarray, b: np.ndarray) -> float:
-    A = np.unwrap(np.angle(a)) * 180 / np.pi
-    B = np.unwrap(np.angle(b)) * 180 / np.pi
+    A = _unwrap_vec(np.angle(a)) * 180 / np.pi
+    B = _unwrap_vec(np.angle(b)) * 180 / np.pi
     return float(np.sqrt(np.mean((A - B) ** 2)))
 
+# Kernel fusionado: ambas métricas en una sola pasada sobre los arrays, sin
+# temporales (abs/log10/unwrap separados hacen 5-6 recorridos completos).
+# Numba es opcional: sin él se usan las versiones NumPy de arriba.
+try:
+    from numba import njit as _njit
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+
+if _HAS_NUMBA:
+    @_njit(cache=True, fastmath=True)
+    def _rmse_db_phase(a, b):
+        n = a.size
+        sdb = 0.0
+        sph = 0.0
+        pa_prev = 0.0; pb_prev = 0.0
+        pa_off = 0.0; pb_off = 0.0  # desplazamiento acumulado del unwrap
+        for i in range(n):
+            mag_a = 20.0 * math.log10(math.hypot(a[i].real, a[i].imag))
+            mag_b = 20.0 * math.log10(math.hypot(b[i].real, b[i].imag))
+            d = mag_a - mag_b
+            sdb += d * d
+            pa = math.atan2(a[i].imag, a[i].real)
+            pb = math.atan2(b[i].imag, b[i].real)
+            if i > 0:
+                if pa - pa_prev > math.pi:
+                    pa_off -= 2.0 * math.pi
+                elif pa - pa_prev < -math.pi:
+                    pa_off += 2.0 * math.pi
+                if pb - pb_prev > math.pi:
+                    pb_off -= 2.0 * math.pi
+                elif pb - pb_prev < -math.pi:
+                    pb_off += 2.0 * math.pi
+            pa_prev = pa; pb_prev = pb
+            dph = (pa + pa_off) - (pb + pb_off)
+            sph += dph * dph
+        return math.sqrt(sdb / n), math.sqrt(sph / n) * 180.0 / math.pi
+else:
+    def _rmse_db_phase(a, b):
+        return rmse_db(a, b), rmse_phase_deg(a, b)
+
+def _write_rlc_row(path: Path, R: float, L: float, C: float, e_db: float, e_ph: float) -> None:
+    """Escribe el CSV por archivo (1 fila) sin pasar por pandas: para una fila
+    trivial, el f-string directo evita toda la maquinaria de to_csv."""
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write("R[Ω],L[H],C[F],rmse_db,rmse_phase_deg\n")
+        fp.write(f"{R:.9g},{L:.9g},{C:.9g},{e_db:.6g},{e_ph:.6g}\n")
+
+# Prefijos SI indexados por floor(log10/3): un log10 + clamp en lugar del
+# barrido con comparaciones de la versión anterior
+_SI_SCALES = ((1e-12, "p"), (1e-9, "n"), (1e-6, "µ"), (1e-3, "m"),
+              (1.0, ""), (1e3, "k"), (1e6, "M"), (1e9, "G"))
+
 def fmt_si(x: float, unit: str) -> str:
     if x == 0 or math.isnan(x): return f"0 {unit}"
-    scales = [(1e-12, "p"), (1e-9, "n"), (1e-6, "µ"), (1e-3, "m"), (1e3, "k"), (1e6, "M"), (1e9, "G")]
-    absx = abs(x); sym = ""; scale = 1.0
-    for s, s_sym in scales:
-        if absx >= s and s >= scale: sym, scale = s_sym, s
-    return f"{x/scale:.3g} {sym}{unit}" if sym else f"{x:.3g} {unit}"
+    k = max(-4, min(3, int(math.floor(math.log10(abs(x)) / 3))))
+    scale, sym = _SI_SCALES[k + 4]
+    return f"{x/scale:.3g} {sym}{unit}"
 
 # ---------- batch ----------
+def _iter_s2p(data_dir: Path, recursive: bool):
+    """Itera rutas .s2p con os.scandir/os.walk: una pasada de syscalls, sin
+    materializar un PosixPath por entrada como hace Path.glob."""
+    if recursive:
+        for root, _, fnames in os.walk(data_dir):
+            for n in fnames:
+                if n.endswith(".s2p"):
+                    yield os.path.join(root, n)
+    else:
+        for entry in os.scandir(data_dir):
+            if entry.name.endswith(".s2p"):
+                yield entry.path
+
+def _fit_equivalent_scalar(ntw, cfg) -> tuple[float, float, float]:
+    """fit_equivalent devuelve un DataFrame 1×k; aquí se extraen R, L y C en
+    una sola pasada iloc→numpy (tres accesos escalares .loc eran de lo más
+    lento de pandas en el camino caliente)."""
+    res = fit_equivalent(ntw, cfg)
+    R, L, C = res.iloc[0, :3].to_numpy(dtype=float)
+    return float(R), float(L), float(C)
+
+# cfg compartido por worker: el initializer lo fija una vez por proceso en
+# lugar de picklear el objeto OmegaConf/pydantic con cada tarea
+_CFG = None
+
+def _init_worker(cfg) -> None:
+    global _CFG
+    _CFG = cfg
+
+def _fit_one(fpath: Path | str) -> dict:
+    """Ajusta un único .s2p. Función top-level para que sea picklable y pueda
+    ejecutarse en procesos hijos. Las métricas/CSV/plots se hacen en el padre
+    para poder vectorizarlas sobre todo el lote."""
+    fpath = Path(fpath)
+    try:
+        ntw = load_s2p_cached(fpath)
+        R, L, C = _fit_equivalent_scalar(ntw, _CFG)
+
+        z0 = np.asarray(ntw.z0)
+        if getattr(z0, "ndim", 1) > 1:  # (N,2) → puerto 1
+            z0 = z0[:, 0]
+
+        # ntw.s[:,0,0] es una vista con stride del array 3D: se copia a
+        # layout C contiguo para que los kernels (ufuncs/Numba) tomen el
+        # camino rápido SIMD en lugar del bucle con strides
+        return {
+            "file": fpath.name,
+            "stem": fpath.stem,
+            "R[Ω]": R,
+            "L[H]": L,
+            "C[F]": C,
+            "f": np.ascontiguousarray(ntw.f, dtype=np.float64),
+            "s11_meas": np.ascontiguousarray(ntw.s[:, 0, 0], dtype=np.complex128),
+            "z0": np.ascontiguousarray(z0, dtype=np.complex128),
+        }
+    except Exception as e:
+        return {"file": fpath.name, "error": str(e)}
+
 def batch_fit(
     data_dir: Path = Path("data/raw"),
     cfg_path: Path = Path("config/base.yaml"),
@@ -85,16 +253,74 @@ def batch_fit(
     console = Console()
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    pattern = "**/*.s2p" if recursive else "*.s2p"
-    files = sorted(data_dir.glob(pattern))
+    # Lista solo porque la barra de progreso necesita el total; el orden de
+    # entrada da igual (el resumen se reordena por RMSE al final)
+    files = list(_iter_s2p(data_dir, recursive))
     if not files:
         console.print(f"[red]No hay .s2p en {data_dir}[/red]")
         return
 
     cfg = load_config(cfg_path)
-    rows = []
     console.print(f"[cyan]Procesando {len(files)} archivo(s) .s2p desde {data_dir}[/cyan]")
 
+    # Acumulador SoA: columnas tipadas preasignadas en lugar de lista de
+    # dicts (sin construcción de dict por fila ni inferencia de pandas, y las
+    # columnas quedan listas para el cálculo vectorizado de métricas).
+    N = len(files)
+    R_arr = np.empty(N); L_arr = np.empty(N); C_arr = np.empty(N)
+    names: list[str] = []
+    stems: list[str] = []
+    f_list: list[np.ndarray] = []
+    s11_list: list[np.ndarray] = []
+    z0_list: list[np.ndarray] = []
+    n_ok = 0
+
+    # Camino vectorizado: las rejillas se leen UNA sola vez en el padre (la
+    # caché .npz hace la relectura casi gratis) y, si todo el lote comparte
+    # rejilla, un único fit_equivalent_batch resuelve los 3·N parámetros de
+    # golpe (jacobiano bloque-diagonal) sin levantar el pool de procesos.
+    batch_done = False
+    loaded: list[tuple[str, str, np.ndarray, np.ndarray, np.ndarray]] = []
+    load_errors: list[str] = []
+    for fp in files:
+        p = Path(fp)
+        try:
+            ntw = load_s2p_cached(p)
+            z0 = np.asarray(ntw.z0)
+            if getattr(z0, "ndim", 1) > 1:  # (N,2) → puerto 1
+                z0 = z0[:, 0]
+            loaded.append((
+                p.name, p.stem,
+                np.ascontiguousarray(ntw.f, dtype=np.float64),
+                np.ascontiguousarray(ntw.s[:, 0, 0], dtype=np.complex128),
+                np.ascontiguousarray(z0, dtype=np.complex128),
+            ))
+        except Exception as e:
+            # se informa solo si se consuma el camino por lote; en el camino
+            # por archivo lo reporta el propio pool al reintentar
+            load_errors.append(f"[red]❌ {p.name}[/red] → {e}")
+
+    if len(loaded) >= 2 and all(np.array_equal(r[2], loaded[0][2]) for r in loaded):
+        try:
+            P = fit_equivalent_batch(
+                np.vstack([r[3] for r in loaded]),
+                loaded[0][2],
+                np.vstack([r[4] for r in loaded]),
+                cfg,
+            )
+            for k, (name, stem, f, s11, z0) in enumerate(loaded):
+                R_arr[n_ok], L_arr[n_ok], C_arr[n_ok] = P[k]
+                names.append(name); stems.append(stem)
+                f_list.append(f); s11_list.append(s11); z0_list.append(z0)
+                n_ok += 1
+            batch_done = True
+            console.print(f"[cyan]🧮 Rejilla común → ajuste vectorizado de {n_ok} archivo(s) en un solo solve[/cyan]")
+            for msg in load_errors:
+                console.print(msg)
+        except Exception as e:
+            console.print(f"[yellow]⚠️  Ajuste por lote no disponible ({e}) → por archivo[/yellow]")
+    del loaded
+
     progress = Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -105,72 +331,125 @@ def batch_fit(
         console=console,
     )
 
-    with progress:
-        task = progress.add_task("Ajustando…", total=len(files))
-
-        for fpath in files:
-            try:
-                ntw = rf.Network(str(fpath))
-                res = fit_equivalent(ntw, cfg)  # DataFrame con R,L,C
-
-                f = ntw.f
-                s11_meas = ntw.s[:, 0, 0]
-                z0 = ntw.z0
-                s11_model = gamma_rlc_series(
-                    f, z0,
-                    float(res.loc[0, "R[Ω]"]),
-                    float(res.loc[0, "L[H]"]),
-                    float(res.loc[0, "C[F]"]),
-                )
-
-                e_db = rmse_db(s11_meas, s11_model)
-                e_ph = rmse_phase_deg(s11_meas, s11_model)
-
-                # CSV por archivo
-                per_file_csv = out_dir / f"{fpath.stem}_rlc.csv"
-                res2 = res.copy()
-                res2.loc[0, "rmse_db"] = e_db
-                res2.loc[0, "rmse_phase_deg"] = e_ph
-                res2.to_csv(per_file_csv, index=False)
-
-                # Gráficos por archivo (si posible)
-                if plots and _HAS_PLOTTING:
-                    plot_s11_meas_vs_model(f, s11_meas, s11_model, out_dir, fpath.stem)
-
-                rows.append({
-                    "file": fpath.name,
-                    "R[Ω]": float(res.loc[0, "R[Ω]"]),
-                    "L[H]": float(res.loc[0, "L[H]"]),
-                    "C[F]": float(res.loc[0, "C[F]"]),
-                    "rmse_db": e_db,
-                    "rmse_phase_deg": e_ph,
-                })
-            except Exception as e:
-                console.print(f"[red]❌ {fpath.name}[/red] → {e}")
-            finally:
-                progress.update(task, advance=1)
-
-    if not rows:
+    # Camino por archivo (rejillas dispares o lote de 1): CPU-bound → un
+    # proceso por núcleo físico. cfg se carga una sola vez en el padre y se
+    # fija en cada worker vía initializer (un solo pickle por proceso).
+    if not batch_done:
+        pool = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                   initializer=_init_worker, initargs=(cfg,))
+        with progress, pool as ex:
+            task = progress.add_task("Ajustando…", total=len(files))
+            # Redibujar la barra por archivo domina con ajustes rápidos y
+            # lotes grandes → se actualiza cada K archivos (~200 redraws/lote)
+            done = 0
+            step = max(1, len(files) // 200)
+
+            for row in ex.map(_fit_one, files):
+                if "error" in row:
+                    console.print(f"[red]❌ {row['file']}[/red] → {row['error']}")
+                else:
+                    R_arr[n_ok] = row["R[Ω]"]
+                    L_arr[n_ok] = row["L[H]"]
+                    C_arr[n_ok] = row["C[F]"]
+                    names.append(row["file"])
+                    stems.append(row["stem"])
+                    f_list.append(row["f"])
+                    s11_list.append(row["s11_meas"])
+                    z0_list.append(row["z0"])
+                    n_ok += 1
+                done += 1
+                if done % step == 0 or done == len(files):
+                    progress.update(task, completed=done)
+
+    if n_ok == 0:
         console.print("[red]No se pudieron generar resultados.[/red]")
         return
 
-    df = pd.DataFrame(rows).sort_values("rmse_db").reset_index(drop=True)
+    R_arr = R_arr[:n_ok]; L_arr = L_arr[:n_ok]; C_arr = C_arr[:n_ok]
+
+    # Métricas del lote: si todos los archivos comparten la rejilla de
+    # frecuencias (típico tras calibrar con puntos fijos), una sola expresión
+    # broadcast calcula todas las Γ del modelo y los RMSE de golpe.
+    f0_grid = f_list[0]
+    same_grid = all(np.array_equal(f, f0_grid) for f in f_list)
+
+    if same_grid:
+        S_meas = np.vstack(s11_list)
+        Z0 = np.vstack(z0_list)
+        S_model = gamma_rlc_series_2d(f0_grid, Z0, R_arr, L_arr, C_arr)
+
+        A = _db_fused(S_meas)
+        B = _db_fused(S_model)
+        e_db_arr = np.sqrt(np.mean((A - B) ** 2, axis=1))
+        PA = _unwrap_vec(np.angle(S_meas)) * 180 / np.pi
+        PB = _unwrap_vec(np.angle(S_model)) * 180 / np.pi
+        e_ph_arr = np.sqrt(np.mean((PA - PB) ** 2, axis=1))
+        models = list(S_model)
+    else:
+        models = []
+        e_db_arr = np.empty(n_ok); e_ph_arr = np.empty(n_ok)
+        out_buf = scr_buf = None
+        for i in range(n_ok):
+            n = f_list[i].shape[0]
+            if out_buf is None or out_buf.shape[0] != n:
+                out_buf = np.empty(n, np.complex128)
+                scr_buf = np.empty(n, np.complex128)
+            m = gamma_rlc_series(f_list[i], z0_list[i], R_arr[i], L_arr[i], C_arr[i],
+                                 out=out_buf, scratch=scr_buf)
+            e_db_arr[i], e_ph_arr[i] = _rmse_db_phase(s11_list[i], m)
+            # el buffer se reutiliza en la siguiente vuelta → copiar solo si
+            # el plot lo va a necesitar después
+            models.append(m.copy() if (plots and _HAS_PLOTTING) else None)
+
+    # Salidas por archivo (CSV + gráficos) con las métricas ya calculadas.
+    # El renderizado matplotlib domina el tiempo por archivo → se despacha a
+    # un pool propio para no bloquear el hilo principal.
+    plot_pool = ProcessPoolExecutor(max_workers=2) if (plots and _HAS_PLOTTING) else None
+    plot_futures = []
+    for i in range(n_ok):
+        per_file_csv = out_dir / f"{stems[i]}_rlc.csv"
+        _write_rlc_row(per_file_csv, R_arr[i], L_arr[i], C_arr[i],
+                       e_db_arr[i], e_ph_arr[i])
+
+        if plot_pool is not None:
+            plot_futures.append(plot_pool.submit(
+                plot_s11_meas_vs_model, f_list[i], s11_list[i], models[i], out_dir, stems[i]
+            ))
+
+    if plot_pool is not None:
+        plot_pool.shutdown(wait=True)
+        for fut in plot_futures:
+            exc = fut.exception()
+            if exc is not None:
+                console.print(f"[yellow]⚠️  Gráfico no generado → {exc}[/yellow]")
+
+    # Orden por RMSE con argsort sobre la columna SoA (sin df.sort_values)
+    order = np.argsort(e_db_arr, kind="stable")
+
+    # Resumen directo desde las columnas SoA: una fila formateada por archivo,
+    # sin pasar por pandas para un CSV numérico pequeño
     resume_csv = out_dir / "resumen_rlc.csv"
-    df.to_csv(resume_csv, index=False)
+    with open(resume_csv, "w", encoding="utf-8") as fp:
+        fp.write("file,R[Ω],L[H],C[F],rmse_db,rmse_phase_deg\n")
+        for i in order:
+            fp.write(f"{names[i]},{R_arr[i]:.9g},{L_arr[i]:.9g},{C_arr[i]:.9g},"
+                     f"{e_db_arr[i]:.6g},{e_ph_arr[i]:.6g}\n")
 
-    # Tabla final
+    # Tabla final, directa desde las columnas SoA (iterrows encajona cada
+    # celda en objetos Python; aquí solo formateamos escalares ya extraídos)
     table = Table(title="📊 Resumen batch (ordenado por RMSE dB)", header_style="bold magenta")
     for col in ["file","R","L","C","RMSE dB","RMSE fase (°)"]:
         table.add_column(col)
-    for _, r in df.iterrows():
-        color = "green" if r["rmse_db"] <= rmse_ok_db else ("yellow" if r["rmse_db"] <= rmse_warn_db else "red")
+    for i in order:
+        e_db = e_db_arr[i]
+        color = "green" if e_db <= rmse_ok_db else ("yellow" if e_db <= rmse_warn_db else "red")
         table.add_row(
-            r["file"],
-            fmt_si(r["R[Ω]"], "Ω"),
-            fmt_si(r["L[H]"], "H"),
-            fmt_si(r["C[F]"], "F"),
-            f"[{color}]{r['rmse_db']:.3f}[/{color}]",
-            f"{r['rmse_phase_deg']:.2f}",
+            names[i],
+            fmt_si(R_arr[i], "Ω"),
+            fmt_si(L_arr[i], "H"),
+            fmt_si(C_arr[i], "F"),
+            f"[{color}]{e_db:.3f}[/{color}]",
+            f"{e_ph_arr[i]:.2f}",
         )
 
     console.print()
@@ -1,15 +1,32 @@
 
+import csv as csv_mod
 from pathlib import Path
-import pandas as pd
 import typer
 
 app = typer.Typer()
 
+def _csv_to_markdown(rows: list[list[str]]) -> str:
+    """Convierte filas CSV en una tabla markdown alineada. Emisor manual:
+    importar pandas solo para reformatear un CSV pequeño cuesta más que toda
+    la conversión."""
+    widths = [max(len(c) for c in col) for col in zip(*rows)]
+    head, body = rows[0], rows[1:]
+    lines = [
+        "| " + " | ".join(h.ljust(w) for h, w in zip(head, widths)) + " |",
+        "|" + "|".join("-" * (w + 2) for w in widths) + "|",
+    ]
+    lines += ["| " + " | ".join(c.ljust(w) for c, w in zip(r, widths)) + " |" for r in body]
+    return "\n".join(lines)
+
 @app.command()
 def main(csv: Path, out: Path = Path("reports/tables/summary.md")):
-    df = pd.read_csv(csv)
+    with open(csv, newline="", encoding="utf-8") as fp:
+        rows = list(csv_mod.reader(fp))
+    if not rows:
+        print(f"❌ CSV vacío: {csv}")
+        raise typer.Exit(code=1)
     out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text(df.to_markdown(index=False), encoding="utf-8")
+    out.write_text(_csv_to_markdown(rows), encoding="utf-8")
     print(f"Reporte escrito en: {out}")
 
 if __name__ == "__main__":
@@ -0,0 +1,284 @@
+# scripts/nanovna_base.py
+"""Base común de los drivers serie del NanoVNA V2 (SAA-2).
+
+Habla el protocolo binario del V2 sobre el puerto CDC-ACM:
+  - INDICATE (0x0D): el firmware responde 0x32 ('2') si es un V2.
+  - READ     (0x10/0x11/0x12): lectura de registros de 1/2/4 bytes.
+  - READFIFO (0x18): lectura de puntos del FIFO de valores (addr 0x30,
+    32 bytes por punto: 6×int32 fwd0/rev0/rev1 re+im, uint16 freqIndex, pad).
+  - WRITE    (0x20..0x23): escritura de registros de 1/2/4/8 bytes.
+
+Registros little-endian relevantes:
+  0x00 sweepStartHz (u64) · 0x10 sweepStepHz (u64)
+  0x20 sweepPoints  (u16) · 0x22 valuesPerFrequency (u16)
+
+S11 = rev0/fwd0 y S21 = rev1/fwd0 (fwd0 es la referencia del puerto 1).
+
+Toda la maquinaria de protocolo, parseo y captura vive aquí para que cada
+optimización se aplique una sola vez; las subclases (nanovna_saa2,
+nanovna_simple) solo aportan presentación y variantes de captura.
+"""
+import time
+from typing import NamedTuple
+
+import numpy as np
+import serial
+from matplotlib.collections import LineCollection
+
+# Rejilla de la carta de Smith precalculada en el import: los tres círculos
+# de referencia no cambian nunca, y como LineCollection son UN artista en
+# lugar de tres Line2D por figura.
+_theta = np.linspace(0, 2 * np.pi, 100)
+_SMITH_CIRCLES = np.stack([
+    np.stack([r * np.cos(_theta), r * np.sin(_theta)], axis=1)
+    for r in (0.2, 0.5, 1.0)
+])
+
+
+def _add_smith_grid(ax) -> None:
+    ax.add_collection(LineCollection(_SMITH_CIRCLES, colors="gray",
+                                     linewidths=0.5, alpha=0.5))
+
+
+class Sweep(NamedTuple):
+    """Un barrido completo en columnas (SoA): frecuencias en Hz y trazas
+    S11/S21 como arrays complejos. Magnitud/fase se derivan bajo demanda
+    (np.abs/np.angle) en vez de guardarse por punto."""
+    freq: np.ndarray
+    s11: np.ndarray
+    s21: np.ndarray
+
+
+# Layout de un punto del FIFO (32 bytes) como dtype estructurado: permite
+# decodificar el bloque entero con un solo np.frombuffer en lugar de siete
+# struct.unpack por punto.
+FIFO_DTYPE = np.dtype([
+    ("fwd_re", "<i4"), ("fwd_im", "<i4"),
+    ("rev0_re", "<i4"), ("rev0_im", "<i4"),
+    ("rev1_re", "<i4"), ("rev1_im", "<i4"),
+    ("freq_idx", "<u2"), ("pad", "<u2"), ("rsvd", "<u4"),
+])
+assert FIFO_DTYPE.itemsize == 32
+
+# Parser compilado para barridos largos / streaming: con N≥~500 puntos el
+# coste pasa a estar en los temporales del camino frombuffer; el bucle
+# njit hace una sola pasada sin asignar nada intermedio. Numba es opcional:
+# sin él siempre se usa el camino NumPy. La firma explícita fuerza la
+# compilación en el import (la caché la amortiza entre ejecuciones).
+try:
+    from numba import njit as _njit, types as _nbt
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+
+if _HAS_NUMBA:
+    # frombuffer sobre bytes da un array de solo lectura → firma readonly
+    _PARSE_SIG = _nbt.Tuple((_nbt.uint16[:], _nbt.complex128[:], _nbt.complex128[:]))(
+        _nbt.Array(_nbt.uint8, 1, "C", readonly=True))
+
+    @_njit(_PARSE_SIG, cache=True, fastmath=True)
+    def _parse_fifo_bulk(buf):
+        n = buf.size // 32
+        freq_idx = np.empty(n, np.uint16)
+        s11 = np.empty(n, np.complex128)
+        s21 = np.empty(n, np.complex128)
+        for k in range(n):
+            off = k * 32
+            vals = np.empty(6, np.float64)
+            for j in range(6):
+                o = off + 4 * j
+                v = (np.int64(buf[o]) | (np.int64(buf[o + 1]) << 8)
+                     | (np.int64(buf[o + 2]) << 16) | (np.int64(buf[o + 3]) << 24))
+                if v >= 2147483648:  # int32 con signo
+                    v -= 4294967296
+                vals[j] = v
+            freq_idx[k] = buf[off + 24] | (np.int64(buf[off + 25]) << 8)
+            fr, fi = vals[0], vals[1]
+            if fr * fr + fi * fi <= 1e-12:  # |fwd| ≤ 1e-6 → referencia nula
+                fr, fi = 1.0, 0.0
+            fwd = complex(fr, fi)
+            s11[k] = complex(vals[2], vals[3]) / fwd
+            s21[k] = complex(vals[4], vals[5]) / fwd
+        return freq_idx, s11, s21
+
+_NUMBA_MIN_POINTS = 512  # por debajo, frombuffer ya va sobrado
+
+
+class NanoVNABase:
+    """Protocolo y captura comunes; las subclases añaden la presentación."""
+
+    def __init__(self, port: str = "/dev/ttyACM0", baudrate: int = 921600, timeout: float = 2.0):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.serial = None
+        self.sweep_start_hz = None
+        self.sweep_step_hz = None
+        self.sweep_points = None
+        # Buffer RX reutilizado entre barridos: 64 KB cubre 2048 puntos sin
+        # asignar ~32 KB de basura por captura en bucles de refresco
+        self._rx_buf = bytearray(64 * 1024)
+
+    # ---------- conexión y comandos ----------
+    def connect(self) -> bool:
+        """Abre el puerto y comprueba con INDICATE que hay un V2 al otro lado.
+
+        El V2 es un dispositivo USB CDC-ACM: el enlace va a 12 Mbit/s haga
+        lo que haga el baudrate (en Linux el ajuste es un no-op), pero
+        algunos drivers/firmwares sí lo respetan y a 9600 un barrido de
+        1001 puntos (32 KB) tardaría ~33 s solo de línea. Se intenta
+        921600 y, si el INDICATE no responde, se recae a 9600.
+        """
+        for baud in (self.baudrate, 9600):
+            try:
+                self.serial = serial.Serial(self.port, baud, timeout=self.timeout)
+            except serial.SerialException as e:
+                print(f"❌ No se pudo abrir {self.port}: {e}")
+                return False
+            time.sleep(0.2)  # algunos conversores tardan en asentar DTR
+            self.serial.reset_input_buffer()  # descarta basura de la apertura
+            resp = self._send_command(bytes([0x0D]), read_len=1)
+            if resp == b"2":
+                self.baudrate = baud
+                print(f"✅ NanoVNA V2 detectado en {self.port} ({baud} baud)")
+                return True
+            self.serial.close()
+            if baud != 9600:
+                print(f"⚠️  Sin respuesta a {baud} baud; se reintenta a 9600")
+        print("❌ El dispositivo no respondió al INDICATE")
+        return False
+
+    def disconnect(self) -> None:
+        if self.serial is not None and self.serial.is_open:
+            self.serial.close()
+            print("🔌 Puerto cerrado")
+
+    def _send_command(self, cmd: bytes, read_len: int = 0) -> bytes:
+        """Envía un comando y lee exactamente `read_len` bytes de respuesta.
+
+        Cada opcode tiene longitud de respuesta conocida (INDICATE=1,
+        WRITE=0, READFIFO=n·32), así que serial.read(read_len) bloquea solo
+        hasta que llegan los bytes (o vence el timeout del puerto) en lugar
+        de dormir 100 ms fijos y leer in_waiting, que además truncaba
+        respuestas que llegaban tarde.
+
+        No se vacía el buffer de entrada aquí: el protocolo es petición-
+        respuesta, así que cada read(read_len) consume exactamente lo suyo.
+        Vaciar antes de cada comando costaba un syscall extra y podía tirar
+        bytes ya emitidos por el firmware (origen de las lecturas truncadas
+        que obligaban a reintentar). Solo connect() y clear_fifo() purgan.
+        """
+        self.serial.write(cmd)
+        if read_len <= 0:
+            return b""
+        return self.serial.read(read_len)
+
+    # ---------- configuración del barrido ----------
+    def setup_sweep(self, start_hz: float, stop_hz: float, points: int = 101) -> None:
+        """Configura sweepStartHz/sweepStepHz/sweepPoints/valuesPerFrequency.
+
+        Usa los opcodes anchos del protocolo — WRITE8 (0x23) para los
+        registros u64 y WRITE2 (0x21) para los u16 — en vez de 20 WRITE de
+        1 byte: 4 comandos en un solo write, y cada registro se escribe de
+        forma atómica (el firmware nunca muestrea uno a medio escribir).
+        """
+        start = int(start_hz)
+        step = int((stop_hz - start_hz) / max(points - 1, 1))
+
+        buf = (bytes([0x23, 0x00]) + start.to_bytes(8, "little")      # sweepStartHz
+               + bytes([0x23, 0x10]) + step.to_bytes(8, "little")     # sweepStepHz
+               + bytes([0x21, 0x20]) + points.to_bytes(2, "little")   # sweepPoints
+               + bytes([0x21, 0x22]) + (1).to_bytes(2, "little"))     # valuesPerFrequency
+        self.serial.write(buf)
+        time.sleep(0.02)  # margen único para que el firmware asiente los registros
+
+        self.sweep_start_hz = start
+        self.sweep_step_hz = step
+        self.sweep_points = points
+        print(f"📡 Barrido: {start/1e6:.3f}–{stop_hz/1e6:.3f} MHz, {points} puntos")
+
+    def clear_fifo(self) -> None:
+        """Escribir cualquier byte en 0x30 vacía el FIFO de valores.
+        También purga el buffer RX local: es el único punto (junto a
+        connect) donde descartar restos de un barrido anterior es seguro."""
+        self._send_command(bytes([0x20, 0x30, 0x00]))
+        self.serial.reset_input_buffer()
+
+    def _read_reg(self, addr: int, n: int = 1) -> int:
+        """READ/READ2/READ4 (0x10/0x11/0x12) de un registro little-endian.
+        Devuelve -1 si el firmware no responde a tiempo."""
+        op = {1: 0x10, 2: 0x11, 4: 0x12}[n]
+        raw = self._send_command(bytes([op, addr]), read_len=n)
+        return int.from_bytes(raw, "little") if len(raw) == n else -1
+
+    def _point_count(self) -> int:
+        """Puntos del barrido en curso ya volcados al FIFO (registro 0x21)."""
+        return self._read_reg(0x21, 2)
+
+    @staticmethod
+    def _readfifo_cmd(n_bytes: int) -> bytes:
+        """Comando READFIFO (0x18, addr 0x30) con cuenta de BYTES de 16 bits
+        little-endian. El firmware espera siempre los 4 bytes y cuenta en
+        bytes, no en puntos: único punto donde se arma este framing para que
+        todas las rutas de captura envíen exactamente lo mismo."""
+        return bytes([0x18, 0x30, n_bytes & 0xFF, (n_bytes >> 8) & 0xFF])
+
+    # ---------- captura ----------
+    def capture_data_smart(self, expected_points: int | None = None) -> Sweep:
+        """Captura un barrido completo (sondeo de progreso + un READFIFO) y
+        devuelve un Sweep (columnas ndarray)."""
+        if expected_points is None:
+            expected_points = self.sweep_points or 101
+        bytes_needed = expected_points * 32
+
+        self.clear_fifo()
+        # Espera activa: se sondea el registro de progreso cada 10 ms hasta
+        # que el barrido ha llenado el FIFO (con tope de 3 s), en vez de
+        # dormir 2 s fijos + 0.5 s por reintento. La captura tarda lo que
+        # tarde el barrido real, no el peor caso.
+        deadline = time.monotonic() + 3.0
+        while self._point_count() < expected_points:
+            if time.monotonic() > deadline:
+                print("⚠️  Timeout esperando el barrido; se lee lo disponible")
+                break
+            time.sleep(0.01)
+
+        # READFIFO admite longitud de 16 bits: todo el barrido en UNA sola
+        # transacción. La respuesta se lee con readinto sobre un bytearray
+        # preasignado: sin concatenaciones bytes+bytes (O(N²) en bytes
+        # movidos) ni objetos intermedios, y tolera lecturas parciales.
+        self.serial.write(self._readfifo_cmd(bytes_needed))
+        if len(self._rx_buf) < bytes_needed:
+            self._rx_buf = bytearray(bytes_needed)  # crece y se queda
+        mv = memoryview(self._rx_buf)
+        off = 0
+        while off < bytes_needed:
+            n = self.serial.readinto(mv[off:bytes_needed])
+            if not n:
+                break  # timeout: se queda con lo recibido
+            off += n
+
+        n_points = off // 32
+        if n_points < expected_points:
+            print(f"⚠️  FIFO incompleto: {n_points}/{expected_points} puntos")
+
+        freq_idx, s11, s21 = self._parse_fifo_block(mv[:n_points * 32])
+        freq = self.sweep_start_hz + self.sweep_step_hz * freq_idx.astype(np.float64)
+        return Sweep(freq=freq, s11=s11, s21=s21)
+
+    @staticmethod
+    def _parse_fifo_block(fifo_data: bytes) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Decodifica TODOS los puntos del bloque de una vez (frombuffer +
+        aritmética vectorizada) y devuelve (freq_idx, s11, s21)."""
+        if _HAS_NUMBA and len(fifo_data) >= _NUMBA_MIN_POINTS * 32:
+            return _parse_fifo_bulk(np.frombuffer(fifo_data, dtype=np.uint8))
+        arr = np.frombuffer(fifo_data, dtype=FIFO_DTYPE)
+        fwd = arr["fwd_re"] + 1j * arr["fwd_im"]
+        # referencia nula → se sustituye por 1 para no dividir por cero
+        fwd = np.where(np.abs(fwd) > 1e-6, fwd, 1.0)
+        s11 = (arr["rev0_re"] + 1j * arr["rev0_im"]) / fwd
+        s21 = (arr["rev1_re"] + 1j * arr["rev1_im"]) / fwd
+        return arr["freq_idx"], s11, s21
+
+    def frequencies_hz(self, n_points: int) -> np.ndarray:
+        return self.sweep_start_hz + self.sweep_step_hz * np.arange(n_points)
@@ -0,0 +1,145 @@
+# scripts/nanovna_saa2.py
+"""Driver completo para el NanoVNA V2 (SAA-2): captura con sondeo de
+progreso y figura 2×2 reutilizable (Smith + |S11| dB + fase + VSWR).
+
+El protocolo y la captura viven en nanovna_base.NanoVNABase; aquí solo
+está la presentación.
+
+Uso:
+    python scripts/nanovna_saa2.py [puerto]
+"""
+import sys
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from nanovna_base import NanoVNABase, Sweep, _add_smith_grid
+
+
+class NanoVNA_SAA2(NanoVNABase):
+    """Control del NanoVNA V2 con captura por sondeo del FIFO y gráficos
+    actualizables en vivo."""
+
+    def __init__(self, port: str = "/dev/ttyACM0", baudrate: int = 921600, timeout: float = 2.0):
+        super().__init__(port=port, baudrate=baudrate, timeout=timeout)
+        # Figura reutilizada entre plots (patrón set_data): crear los 4 ejes
+        # y sus artistas en cada llamada domina el refresco en bucles de
+        # medida; aquí se crean una vez y solo se actualizan los datos.
+        self._fig = None
+        self._axes = None
+        self._lines = {}
+
+    # ---------- salida ----------
+    def _print_debug_info(self, sweep: Sweep) -> None:
+        # abs/angle se evalúan una sola vez y los min/max reducen sobre el
+        # mismo array (antes cada extremo repetía la conversión completa)
+        mag = np.abs(sweep.s11)
+        ph_deg = np.degrees(np.angle(sweep.s11))
+        print(f"🔎 |S11|: {mag.min():.4f}–{mag.max():.4f} · "
+              f"fase: {ph_deg.min():.1f}°–{ph_deg.max():.1f}°")
+
+    def plot_measured_data(self, sweep: Sweep) -> None:
+        """Carta de Smith + |S11| dB + fase + VSWR en una figura 2×2."""
+        if sweep.s11.size == 0:
+            print("❌ Sin datos que graficar")
+            return
+
+        s11_data = sweep.s11
+        s11_magnitude = np.abs(sweep.s11)
+        s11_phase = np.angle(sweep.s11)
+        freqs_mhz = sweep.freq / 1e6
+
+        magnitude_db = 20 * np.log10(np.maximum(s11_magnitude, 1e-6))
+        # VSWR vectorizado: np.where en vez de un branch Python por muestra
+        # (el mínimo en el divisor evita el aviso de división en el ramal no usado)
+        vswr = np.where(s11_magnitude < 0.99,
+                        (1 + s11_magnitude) / (1 - np.minimum(s11_magnitude, 0.98)),
+                        10.0)
+
+        if self._fig is None:
+            # Primera llamada: se montan figura, ejes y artistas y se guardan
+            # los handles de las líneas para actualizarlos después
+            self._fig, self._axes = plt.subplots(2, 2, figsize=(12, 8))
+            (ax1, ax2), (ax3, ax4) = self._axes
+
+            _add_smith_grid(ax1)
+            # .real/.imag son vistas del array complejo: cero copias frente
+            # al par de listcomps por muestra
+            self._lines["smith"] = ax1.plot(s11_data.real, s11_data.imag,
+                                            "b.-", markersize=3)[0]
+            ax1.set_title("Carta de Smith (S11)")
+            ax1.set_aspect("equal"); ax1.grid(True, alpha=0.3)
+
+            self._lines["s11_mag"] = ax2.plot(freqs_mhz, magnitude_db, "b-")[0]
+            ax2.set_title("|S11| [dB]"); ax2.set_xlabel("Frecuencia [MHz]"); ax2.grid(True)
+
+            self._lines["s11_phase"] = ax3.plot(freqs_mhz, np.degrees(s11_phase), "g-")[0]
+            ax3.set_title("Fase S11 [°]"); ax3.set_xlabel("Frecuencia [MHz]"); ax3.grid(True)
+
+            self._lines["vswr"] = ax4.plot(freqs_mhz, vswr, "r-")[0]
+            ax4.set_title("VSWR"); ax4.set_xlabel("Frecuencia [MHz]")
+            ax4.set_ylim(1, 10); ax4.grid(True)
+
+            self._fig.tight_layout()
+            plt.show(block=False)
+        else:
+            # Llamadas siguientes: solo set_data + reescalado, sin recrear
+            # artistas (los Line2D descartados eran pura presión de GC)
+            self._lines["smith"].set_data(s11_data.real, s11_data.imag)
+            self._lines["s11_mag"].set_data(freqs_mhz, magnitude_db)
+            self._lines["s11_phase"].set_data(freqs_mhz, np.degrees(s11_phase))
+            self._lines["vswr"].set_data(freqs_mhz, vswr)
+            (ax1, ax2), (ax3, ax4) = self._axes
+            for ax in (ax1, ax2, ax3):
+                ax.relim(); ax.autoscale_view()
+
+        self._fig.canvas.draw_idle()
+        plt.pause(0.001)  # procesa eventos de la GUI sin bloquear
+
+        self._print_debug_info(sweep)
+
+    def _plot_demo_data(self) -> None:
+        """Figura de demostración (sin VNA conectado): resonador serie sintético."""
+        f = np.linspace(50e6, 900e6, 101)
+        w = 2 * np.pi * f
+        z = 15 + 1j * (w * 5e-9 - 1 / (w * 3e-12))
+        s11 = (z - 50) / (z + 50)
+
+        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 8))
+        _add_smith_grid(ax1)
+        ax1.plot(s11.real, s11.imag, "b.-", markersize=3)
+        ax1.set_title("Carta de Smith (demo)"); ax1.set_aspect("equal"); ax1.grid(True, alpha=0.3)
+
+        mags = np.abs(s11)
+        ax2.plot(f / 1e6, 20 * np.log10(np.maximum(mags, 1e-6)), "b-")
+        ax2.set_title("|S11| [dB] (demo)"); ax2.grid(True)
+
+        ax3.plot(f / 1e6, np.degrees(np.unwrap(np.angle(s11))), "g-")
+        ax3.set_title("Fase S11 [°] (demo)"); ax3.grid(True)
+
+        vswr = np.where(mags < 0.99, (1 + mags) / (1 - np.minimum(mags, 0.98)), 10.0)
+        ax4.plot(f / 1e6, vswr, "r-")
+        ax4.set_title("VSWR (demo)"); ax4.set_ylim(1, 10); ax4.grid(True)
+
+        plt.tight_layout()
+        plt.show()
+
+
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else "/dev/ttyACM0"
+    vna = NanoVNA_SAA2(port=port)
+    if not vna.connect():
+        print("ℹ️  Sin VNA: mostrando datos de demostración")
+        vna._plot_demo_data()
+        return
+    try:
+        vna.setup_sweep(50e6, 900e6, 101)
+        sweep = vna.capture_data_smart()
+        vna.plot_measured_data(sweep)
+        plt.show()  # mantiene abierta la figura (el plot ya no bloquea)
+    finally:
+        vna.disconnect()
+
+
+if __name__ == "__main__":
+    main()
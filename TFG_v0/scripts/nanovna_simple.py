@@ -0,0 +1,112 @@
+# scripts/nanovna_simple.py
+"""Variante mínima del driver V2 (SAA-2): una sola lectura acotada del
+FIFO, sin sondeo de progreso. Útil para comprobar rápidamente que el VNA
+responde. Protocolo y conexión heredados de nanovna_base.NanoVNABase.
+
+Uso:
+    python scripts/nanovna_simple.py [puerto]
+"""
+import struct
+import sys
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from nanovna_base import NanoVNABase, _add_smith_grid
+
+# Formato de un punto del FIFO compilado una sola vez: 6×int32 + uint16 +
+# 6 bytes de relleno = 32 bytes. Un unpack_from devuelve los 7 campos de
+# golpe en vez de re-parsear '<i'/'<H' siete veces por punto.
+_POINT_STRUCT = struct.Struct("<6iH6x")
+assert _POINT_STRUCT.size == 32
+
+
+class NanoVNA_Simple(NanoVNABase):
+    """Captura básica: configura el barrido y lee el FIFO de una sola vez."""
+
+    def capture_data(self) -> list[dict]:
+        """Vacía el FIFO, espera al barrido y hace una única lectura acotada."""
+        self.clear_fifo()
+        time.sleep(2.0)  # sin sondeo de progreso: margen fijo para el barrido
+
+        n_pts = min(self.sweep_points or 32, 32)
+        raw = self._send_command(self._readfifo_cmd(n_pts * 32), read_len=n_pts * 32)
+        n_points = len(raw) // 32
+        if n_points == 0:
+            print("⚠️  El FIFO no devolvió datos")
+            return []
+
+        data_points = []
+        for i in range(n_points):
+            data_points.append(self._parse_fifo_data(raw[i * 32:(i + 1) * 32]))
+        return data_points
+
+    def _parse_fifo_data(self, fifo_data: bytes) -> dict:
+        fwd_re, fwd_im, rev0_re, rev0_im, rev1_re, rev1_im, freq_idx = \
+            _POINT_STRUCT.unpack_from(fifo_data, 0)
+
+        fwd = complex(fwd_re, fwd_im)
+        if abs(fwd) < 1e-6:
+            fwd = 1.0
+        s11 = complex(rev0_re, rev0_im) / fwd
+        s21 = complex(rev1_re, rev1_im) / fwd
+        return {
+            "freq_idx": freq_idx,
+            "s11": s11,
+            "s21": s21,
+            "s11_magnitude": abs(s11),
+            "s11_phase": np.angle(s11),
+        }
+
+    def plot_results(self, data_points: list[dict]) -> None:
+        if not data_points:
+            print("❌ Sin datos que graficar")
+            return
+
+        # columnas como ndarray: .real/.imag pasan a ser vistas sin copia
+        s11_data = np.array([p["s11"] for p in data_points], dtype=np.complex128)
+        s11_magnitude = np.array([p["s11_magnitude"] for p in data_points])
+        s11_phase = np.array([p["s11_phase"] for p in data_points])
+        freqs_mhz = (self.sweep_start_hz + self.sweep_step_hz * np.arange(len(data_points))) / 1e6
+
+        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 8))
+
+        _add_smith_grid(ax1)
+        ax1.plot(s11_data.real, s11_data.imag, "b.-", markersize=3)
+        ax1.set_title("Carta de Smith (S11)"); ax1.set_aspect("equal"); ax1.grid(True, alpha=0.3)
+
+        magnitude_db = 20 * np.log10(np.maximum(s11_magnitude, 1e-6))
+        ax2.plot(freqs_mhz, magnitude_db, "b-")
+        ax2.set_title("|S11| [dB]"); ax2.set_xlabel("Frecuencia [MHz]"); ax2.grid(True)
+
+        ax3.plot(freqs_mhz, np.degrees(s11_phase), "g-")
+        ax3.set_title("Fase S11 [°]"); ax3.set_xlabel("Frecuencia [MHz]"); ax3.grid(True)
+
+        # VSWR vectorizado (mismo patrón que nanovna_saa2)
+        vswr = np.where(s11_magnitude < 0.99,
+                        (1 + s11_magnitude) / (1 - np.minimum(s11_magnitude, 0.98)),
+                        10.0)
+        ax4.plot(freqs_mhz, vswr, "r-")
+        ax4.set_title("VSWR"); ax4.set_xlabel("Frecuencia [MHz]")
+        ax4.set_ylim(1, 10); ax4.grid(True)
+
+        plt.tight_layout()
+        plt.show()
+
+
+def main():
+    port = sys.argv[1] if len(sys.argv) > 1 else "/dev/ttyACM0"
+    vna = NanoVNA_Simple(port=port)
+    if not vna.connect():
+        return
+    try:
+        vna.setup_sweep(50e6, 900e6, 101)
+        data_points = vna.capture_data()
+        vna.plot_results(data_points)
+    finally:
+        vna.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,27 +5,38 @@
 #  Autor: Basado en script de Izan París Marcos - TFG 2025
 # -------------------------------------------------------------
 
+import io
 import os
 import time
 import numpy as np
-import pandas as pd
-import pynanovna
-import skrf as rf
-import matplotlib.pyplot as plt
 import sys
 import ast
 
+# pandas, pynanovna, skrf y matplotlib se importan de forma perezosa dentro
+# de las funciones que los usan: cada uno añade cientos de ms al arranque
+# del script y no todos los flujos los necesitan (sys.modules hace que las
+# importaciones repetidas sean gratis).
+
 class VNAMeasurement:
     def __init__(self):
         self.vna = None
         self.measurement_data = None
         self.frequencies = None
+        self.s_matrix = None   # (N, 2, 2) complejo contiguo; s_params son vistas
         self.s_params = {}
+        # caché por parámetro de (magnitud, fase, dB): cada acción del menú
+        # recalculaba abs/angle/log10 sobre el mismo array
+        self._cache = {}
+        # estado de la configuración ya aplicada al equipo: permite saltarse
+        # recargas de calibración y reconfiguraciones de barrido idénticas
+        self._cal_file = None
+        self._sweep_cfg = None
         
     def connect_vna(self):
         """Conectar al NanoVNA"""
         print("📡 Conectando con NanoVNA...")
         try:
+            import pynanovna
             self.vna = pynanovna.VNA()
             if not self.vna.is_connected():
                 print("❌ No se detectó ningún NanoVNA. Verifica el cable USB y el puerto COM.")
@@ -42,13 +53,18 @@ class VNAMeasurement:
         
         cal_file = cal_file.strip().strip('"').strip("'")
         cal_file = os.path.normpath(cal_file)
-        
+
+        if cal_file == self._cal_file:
+            print("✅ Calibración ya cargada (sin cambios)")
+            return True
+
         if not os.path.exists(cal_file):
             print(f"❌ El archivo '{cal_file}' no existe.")
             return False
-        
+
         try:
             self.vna.load_calibration(cal_file)
+            self._cal_file = cal_file
             print(f"✅ Calibración cargada correctamente")
             return True
         except Exception as e:
@@ -57,8 +73,12 @@ class VNAMeasurement:
     
     def configure_sweep(self, start_mhz, stop_mhz, points):
         """Configurar barrido de frecuencia"""
+        if (start_mhz, stop_mhz, points) == self._sweep_cfg:
+            print(f"✅ Barrido ya configurado: {start_mhz}-{stop_mhz} MHz, {points} puntos")
+            return True
+
         print(f"\n⚙️ Configurando barrido: {start_mhz}-{stop_mhz} MHz, {points} puntos")
-        
+
         try:
             self.vna.set_sweep(start_mhz * 1e6, stop_mhz * 1e6, points)
             
@@ -69,6 +89,7 @@ class VNAMeasurement:
                 except Exception:
                     pass
                     
+            self._sweep_cfg = (start_mhz, stop_mhz, points)
             print("✅ Barrido configurado correctamente")
             return True
         except Exception as e:
@@ -84,42 +105,59 @@ class VNAMeasurement:
             self.vna.sweep()
             print("⏱️ Barrido iniciado... esperando adquisición de datos...")
             
-            # Esperar mientras se completa el barrido
-            total_wait = 8  # Aumentado para asegurar captura
-            for i in range(total_wait):
-                bar_len = 30
-                progress = (i + 1) / total_wait
+            # Espera dirigida por eventos: se sondea el estado del VNA cada
+            # 50 ms y se sale en cuanto el barrido termina, en vez de los 8 s
+            # fijos de antes (que dominaban el tiempo por medición). El tope
+            # de 10 s solo actúa como guardia si el equipo no responde.
+            timeout_s = 10.0
+            t0 = time.monotonic()
+            bar_len = 30
+            while True:
+                elapsed = time.monotonic() - t0
+                if hasattr(self.vna, "sweep_done"):
+                    done = self.vna.sweep_done()
+                elif hasattr(self.vna, "is_sweeping"):
+                    done = not self.vna.is_sweeping()
+                else:
+                    # sin API de estado: el tope de tiempo hace de espera fija
+                    done = elapsed >= timeout_s * 0.8
+                progress = 1.0 if done else min(elapsed / timeout_s, 0.99)
                 filled = int(bar_len * progress)
                 bar = "█" * filled + "-" * (bar_len - filled)
                 sys.stdout.write(f"\r📡 Adquiriendo datos: |{bar}| {int(progress*100)}%")
                 sys.stdout.flush()
-                time.sleep(0.5)
-            print("\n✅ Barrido completado.")
-            
-            # Exportar datos a CSV temporal
-            csv_temp = f"{dut_name}_temp_measurement.csv"
-            self.vna.stream_to_csv(csv_temp)
-            print(f"📄 Datos exportados a: {csv_temp}")
+                if done:
+                    break
+                if elapsed >= timeout_s:
+                    print("\n⚠️  Tiempo de espera agotado; se intenta leer lo capturado")
+                    break
+                time.sleep(0.05)
+            print(f"\n✅ Barrido completado en {time.monotonic() - t0:.1f} s.")
             
-            # Verificar que el archivo se creó y tiene datos
-            if not os.path.exists(csv_temp):
-                print("❌ No se pudo crear el archivo CSV temporal")
-                return False
-                
-            file_size = os.path.getsize(csv_temp)
-            if file_size == 0:
-                print("❌ El archivo CSV está vacío")
+            # Exportar el CSV a un buffer en memoria: pd.read_csv acepta
+            # un file-like, así que los datos nunca tocan el disco (sin
+            # escritura, stat ni borrado de un fichero temporal).
+            buf = io.StringIO()
+            try:
+                self.vna.stream_to_csv(buf)
+            except TypeError:
+                # La API solo acepta rutas: retroceso al fichero temporal
+                csv_temp = f"{dut_name}_temp_measurement.csv"
+                self.vna.stream_to_csv(csv_temp)
+                with open(csv_temp, "r") as fh:
+                    buf = io.StringIO(fh.read())
+                os.remove(csv_temp)
+
+            if not buf.getvalue():
+                print("❌ El VNA no devolvió datos CSV")
                 return False
-                
-            print(f"📏 Tamaño del archivo: {file_size} bytes")
-            
+
+            print(f"📏 Datos recibidos: {len(buf.getvalue())} bytes (en memoria)")
+
             # Procesar datos
-            success = self._process_measurement_data(csv_temp)
-            
-            # Limpiar archivo temporal
-            if os.path.exists(csv_temp):
-                os.remove(csv_temp)
-                
+            buf.seek(0)
+            success = self._process_measurement_data(buf)
+
             if success:
                 print(f"✅ Medición del {dut_name} completada y procesada")
                 return True
@@ -131,10 +169,20 @@ class VNAMeasurement:
             print(f"❌ Error durante la medición: {e}")
             return False
     
-    def _process_measurement_data(self, csv_path):
-        """Procesar datos de medición y extraer parámetros S"""
+    def _process_measurement_data(self, csv_source):
+        """Procesar datos de medición (ruta o buffer CSV) y extraer parámetros S"""
         try:
-            df = pd.read_csv(csv_path)
+            import pandas as pd
+            # Motor pyarrow: tokenización multihilo en C++ y conversión
+            # casi sin copias a pandas; varias veces más rápido que el motor
+            # C para barridos largos. Si pyarrow no está instalado se usa el
+            # motor por defecto (el resultado es idéntico).
+            try:
+                df = pd.read_csv(csv_source, engine="pyarrow", dtype_backend="pyarrow")
+            except (ImportError, ValueError):
+                if hasattr(csv_source, "seek"):
+                    csv_source.seek(0)
+                df = pd.read_csv(csv_source)
             print(f"📊 DataFrame cargado: {len(df)} filas, {len(df.columns)} columnas")
             print(f"📋 Columnas: {df.columns.tolist()}")
             
@@ -153,31 +201,39 @@ class VNAMeasurement:
             print("\n🔍 Primeras filas de datos:")
             print(df.head(3))
             
-            # Convertir datos a complejos
-            def parse_complex(val):
+            # Convertir datos a complejos de forma vectorizada. Tras quitar
+            # los paréntesis, los pares "re,im" se parsean con el lector C de
+            # np.genfromtxt (sin pasar por float() de Python campo a campo) y
+            # el (N,2) float64 resultante se reinterpreta como complejo sin
+            # copia. Formato esperado: "(0.123, -0.456)"
+            def parse_complex_column(col):
+                s = col.astype(str).str.strip().str.strip("()")
                 try:
-                    if isinstance(val, complex):
-                        return val
-                    if pd.isna(val):
-                        return complex(0, 0)
-                    # Para cadenas como "(0.123, -0.456)"
-                    if isinstance(val, str):
-                        val = val.strip()
-                        if val.startswith('(') and val.endswith(')'):
-                            val = val[1:-1]
-                        parts = val.split(',')
-                        if len(parts) == 2:
-                            real = float(parts[0].strip())
-                            imag = float(parts[1].strip())
-                            return complex(real, imag)
-                    return complex(val)
-                except Exception as e:
-                    print(f"⚠️ Error parseando valor: {val}, error: {e}")
-                    return complex(0, 0)
-            
+                    arr = np.genfromtxt(io.StringIO("\n".join(s)),
+                                        delimiter=",", dtype=np.float64)
+                    # columna solo-real (sin comas): genfromtxt devuelve N
+                    # floats en 1-D; emparejarlos de dos en dos mezclaría
+                    # filas consecutivas en complejos falsos
+                    if arr.ndim == 1 and len(s) > 1:
+                        return np.nan_to_num(arr).astype(np.complex128)
+                    arr = arr.reshape(-1, 2)  # una sola fila "re,im" llega como (2,)
+                    # campos no parseables → nan → 0 (misma política de antes)
+                    return np.ascontiguousarray(
+                        np.nan_to_num(arr)).view(np.complex128).ravel()
+                except ValueError:
+                    # filas irregulares (sin parte imaginaria, etc.):
+                    # retroceso a la ruta .str/to_numeric de pandas
+                    parts = s.str.split(",", n=1, expand=True)
+                    re = pd.to_numeric(parts[0], errors="coerce").to_numpy(np.float64)
+                    if parts.shape[1] > 1:
+                        im = pd.to_numeric(parts[1], errors="coerce").to_numpy(np.float64)
+                    else:
+                        im = np.zeros_like(re)
+                    return np.nan_to_num(re) + 1j * np.nan_to_num(im)
+
             print("🔄 Convirtiendo datos a complejos...")
-            s11 = np.array([parse_complex(v) for v in df["s11"]])
-            s21 = np.array([parse_complex(v) for v in df["s21"]])
+            s11 = parse_complex_column(df["s11"])
+            s21 = parse_complex_column(df["s21"])
             freqs = df["freq"].to_numpy()
             
             # Verificar que tenemos datos válidos
@@ -190,13 +246,23 @@ class VNAMeasurement:
             if np.all(np.abs(s11) == 0) or np.all(np.abs(s21) == 0):
                 print("⚠️  Advertencia: Todos los valores S11 o S21 son cero")
             
-            # Almacenar parámetros S
+            # Almacenar parámetros S (medición nueva → caché de conversiones fuera)
+            self._cache.clear()
             self.frequencies = freqs
+            # Matriz S contigua (N,2,2): la exportación Touchstone la usa tal
+            # cual (sin re-ensamblar columna a columna) y s_params pasan a ser
+            # vistas sobre el mismo bloque de memoria
+            S = np.empty((len(freqs), 2, 2), dtype=np.complex128)
+            S[:, 0, 0] = s11
+            S[:, 1, 0] = s21
+            S[:, 0, 1] = s21   # Asumiendo reciprocidad
+            S[:, 1, 1] = s11   # Asumiendo simetría
+            self.s_matrix = S
             self.s_params = {
-                'S11': s11,
-                'S21': s21,
-                'S12': s21,  # Asumiendo reciprocidad
-                'S22': s11   # Asumiendo simetría
+                'S11': S[:, 0, 0],
+                'S21': S[:, 1, 0],
+                'S12': S[:, 0, 1],
+                'S22': S[:, 1, 1],
             }
             
             print("✅ Datos procesados correctamente")
@@ -211,21 +277,34 @@ class VNAMeasurement:
     def get_s_parameters(self):
         """Obtener todos los parámetros S medidos"""
         return self.s_params
-    
+
+    def _features(self, parameter):
+        """(magnitud, fase°, dB) de un parámetro, calculado una sola vez.
+
+        Se memoiza en self._cache (se invalida al procesar una medición
+        nueva): graficar y exportar comparten las mismas conversiones.
+        """
+        if parameter not in self._cache:
+            s = self.s_params[parameter]
+            magnitude = np.abs(s)
+            # np.maximum evita log(0) sin la doble pasada de np.where
+            self._cache[parameter] = (
+                magnitude,
+                np.angle(s, deg=True),
+                20 * np.log10(np.maximum(magnitude, 1e-12)),
+            )
+        return self._cache[parameter]
+
     def get_parameter_dB(self, parameter):
         """Obtener parámetro S en dB"""
         if parameter in self.s_params and len(self.s_params[parameter]) > 0:
-            magnitude = np.abs(self.s_params[parameter])
-            # Evitar log(0)
-            magnitude = np.where(magnitude == 0, 1e-10, magnitude)
-            return 20 * np.log10(magnitude)
+            return self._features(parameter)[2]
         return None
-    
+
     def get_parameter_magnitude_phase(self, parameter):
         """Obtener magnitud y fase de un parámetro S"""
         if parameter in self.s_params and len(self.s_params[parameter]) > 0:
-            magnitude = np.abs(self.s_params[parameter])
-            phase = np.angle(self.s_params[parameter], deg=True)
+            magnitude, phase, _ = self._features(parameter)
             return magnitude, phase
         return None, None
     
@@ -240,17 +319,21 @@ class VNAMeasurement:
             if not filename.endswith('.s2p'):
                 filename += '.s2p'
             
-            # Crear red de dos puertos
-            s_matrix = np.zeros((len(self.frequencies), 2, 2), dtype=complex)
-            s_matrix[:, 0, 0] = self.s_params['S11']
-            s_matrix[:, 1, 0] = self.s_params['S21']
-            s_matrix[:, 0, 1] = self.s_params['S12']
-            s_matrix[:, 1, 1] = self.s_params['S22']
-            
-            ntw = rf.Network(frequency=self.frequencies, s=s_matrix)
-            
-            # Guardar archivo .s2p
-            ntw.write_touchstone(filename)
+            # Escritura directa: np.savetxt formatea el bloque (N,9) en C,
+            # sin construir un rf.Network solo para write_touchstone (que
+            # formatea fila a fila en Python). Orden Touchstone 2 puertos:
+            # f, S11, S21, S12, S22 en parte real/imaginaria.
+            s = self.s_matrix
+            arr = np.column_stack([
+                self.frequencies,
+                s[:, 0, 0].real, s[:, 0, 0].imag,
+                s[:, 1, 0].real, s[:, 1, 0].imag,
+                s[:, 0, 1].real, s[:, 0, 1].imag,
+                s[:, 1, 1].real, s[:, 1, 1].imag,
+            ])
+            with open(filename, "w") as fh:
+                fh.write("# Hz S RI R 50\n")
+                np.savetxt(fh, arr, fmt="%.9e")
             print(f"✅ Parámetros S guardados en: {filename}")
             return True
             
@@ -265,23 +348,30 @@ class VNAMeasurement:
             return False
         
         try:
+            import pandas as pd
+
             # Asegurar que el archivo tenga extensión .csv
             if not filename.endswith('.csv'):
                 filename += '.csv'
             
+            # Un solo broadcast sobre la matriz (N,4) apilada: abs/angle/log10
+            # se evalúan una vez para los cuatro parámetros en vez de 16
+            # recorridos (4 llamadas por parámetro a los helpers)
+            params = ['S11', 'S21', 'S12', 'S22']
+            S = np.column_stack([self.s_params[p] for p in params])
+            magnitude = np.abs(S)
+            phase = np.angle(S, deg=True)
+            dB = 20 * np.log10(np.maximum(magnitude, 1e-12))
+
             data = {
                 'Frequency_Hz': self.frequencies
             }
-            
-            for param in ['S11', 'S21', 'S12', 'S22']:
-                magnitude, phase = self.get_parameter_magnitude_phase(param)
-                dB = self.get_parameter_dB(param)
-                
-                data[f'{param}_Magnitude'] = magnitude
-                data[f'{param}_Phase_deg'] = phase
-                data[f'{param}_dB'] = dB
-                data[f'{param}_Real'] = self.s_params[param].real
-                data[f'{param}_Imag'] = self.s_params[param].imag
+            for i, param in enumerate(params):
+                data[f'{param}_Magnitude'] = magnitude[:, i]
+                data[f'{param}_Phase_deg'] = phase[:, i]
+                data[f'{param}_dB'] = dB[:, i]
+                data[f'{param}_Real'] = S[:, i].real
+                data[f'{param}_Imag'] = S[:, i].imag
             
             df = pd.DataFrame(data)
             df.to_csv(filename, index=False)
@@ -307,7 +397,9 @@ class VNAMeasurement:
         if not valid_params:
             print("❌ No hay parámetros válidos para graficar")
             return
-        
+
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(12, 6))
         
         for param in valid_params:
@@ -356,12 +448,11 @@ class VNAMeasurement:
             return
         
         try:
-            # Crear network para diagrama de Smith
-            s_matrix = np.zeros((len(self.frequencies), 2, 2), dtype=complex)
-            s_matrix[:, 0, 0] = self.s_params['S11']
-            s_matrix[:, 1, 1] = self.s_params['S22']
-            
-            ntw = rf.Network(frequency=self.frequencies, s=s_matrix)
+            import skrf as rf
+            import matplotlib.pyplot as plt
+
+            # Reutiliza la matriz S ya ensamblada (solo se trazan S11 y S22)
+            ntw = rf.Network(frequency=self.frequencies, s=self.s_matrix)
             
             plt.figure(figsize=(8, 8))
             ntw.plot_s_smith(m=0, n=0, label='S11')
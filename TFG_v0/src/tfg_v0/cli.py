@@ -1,14 +1,30 @@
 import typer
 import numpy as np
 from pathlib import Path
-import skrf as rf
+from types import SimpleNamespace
 import pandas as pd
 from tfg_v0.config import load_config
+from tfg_v0.io.touchstone import load_s11_z0
 from tfg_v0.model import fit_equivalent
 from tfg_v0.plotting.compare import plot_s11_meas_vs_model
 
 app = typer.Typer(help="CLI para flujo completo: ingestión .s2p → ajuste RLC → reportes")
 
+# Tabla de prefijos SI ordenada: searchsorted localiza la escala en O(log k)
+# en vez del barrido lineal con ramas de antes
+_SI_SCALES = np.array([1e-12, 1e-9, 1e-6, 1e-3, 1.0, 1e3, 1e6, 1e9])
+_SI_SYMS = ("p", "n", "µ", "m", "", "k", "M", "G")
+
+def _fmt_si(x: float, unit: str) -> str:
+    """Formatea con prefijo SI (p, n, µ, m, k, M, G)."""
+    import math
+    if x == 0 or math.isnan(x):
+        return f"0 {unit}"
+    i = int(np.searchsorted(_SI_SCALES, abs(x), side="right")) - 1
+    if i < 0 or _SI_SYMS[i] == "":
+        return f"{x:.3g} {unit}"
+    return f"{x / _SI_SCALES[i]:.3g} {_SI_SYMS[i]}{unit}"
+
 @app.command()
 def main(
     s2p: Path = typer.Argument(..., help="Ruta del archivo .s2p a procesar"),
@@ -30,7 +46,10 @@ def main(
     out.mkdir(parents=True, exist_ok=True)
 
     typer.echo(f"📡 Cargando Touchstone: {s2p.name}")
-    ntw = rf.Network(str(s2p))
+    # Parser ligero (cacheado): evita construir un rf.Network completo
+    # cuando solo se necesitan f, S11 y z0
+    f, s11_meas, z0_1 = load_s11_z0(s2p)
+    ntw = SimpleNamespace(f=f, s=s11_meas.reshape(-1, 1, 1), z0=z0_1.reshape(-1, 1))
 
     # ================== AJUSTE DEL MODELO ==================
     typer.echo("⚙️  Ejecutando ajuste RLC ...")
@@ -42,23 +61,29 @@ def main(
     typer.echo(f"💾 Resultados guardados en: {csv_path}")
 
     # ================== GRAFICAR ==================
-    # Prepara datos medidos y del modelo para el plotting
-    f = ntw.f                      # (N,)
-    s11_meas = ntw.s[:, 0, 0]      # (N,)
-
-    # z0 puede ser (N,2) en 2-puertos → usa el puerto 1
-    z0_arr = ntw.z0
-    z0_1 = z0_arr[:, 0] if getattr(z0_arr, "ndim", 1) > 1 else z0_arr
+    # f, s11_meas y z0_1 (puerto 1) ya vienen del parser ligero
 
     # Recupera R, L, C del DataFrame 'res'
     R = float(res.loc[0, "R[Ω]"])
     L = float(res.loc[0, "L[H]"])
     C = float(res.loc[0, "C[F]"])
 
-    # Modelo RLC serie: Γ = (Z - Z0)/(Z + Z0), Z = R + j(ωL - 1/(ωC))
-    w = 2 * np.pi * f
-    Z = R + 1j * (w * L - 1.0 / (w * C))
-    s11_model = (Z - z0_1) / (Z + z0_1)
+    # El modelo ya se evaluó sobre todo el eje dentro de fit_equivalent
+    # (df.attrs): se reutiliza en vez de repetir la división compleja.
+    s11_model = res.attrs.get("s11_model")
+    if s11_model is None:
+        # Modelo RLC serie: Γ = (Z - Z0)/(Z + Z0), Z = R + j(ωL - 1/(ωC)).
+        # numexpr fusiona toda la expresión en una pasada multihilo sin
+        # materializar los ~6 arrays complejos intermedios de NumPy.
+        w = 2 * np.pi * f
+        try:
+            import numexpr as ne
+            s11_model = ne.evaluate(
+                "(R + 1j*(w*L - 1/(w*C)) - z0_1) / (R + 1j*(w*L - 1/(w*C)) + z0_1)"
+            )
+        except ImportError:
+            Z = R + 1j * (w * L - 1.0 / (w * C))
+            s11_model = (Z - z0_1) / (Z + z0_1)
 
     # Llamada correcta a la función de plotting
     plot_s11_meas_vs_model(f, s11_meas, s11_model, out, s2p.stem)
@@ -70,30 +95,6 @@ def main(
 
     console = Console()
 
-    def _fmt_si(x: float, unit: str) -> str:
-        """Formatea con prefijo SI (p, n, µ, m, k, M, G)."""
-        import math
-        if x == 0 or math.isnan(x):
-            return f"0 {unit}"
-        prefixes = [
-            (1e-12, "p"),
-            (1e-9,  "n"),
-            (1e-6,  "µ"),
-            (1e-3,  "m"),
-            (1e3,   "k"),
-            (1e6,   "M"),
-            (1e9,   "G"),
-        ]
-        absx = abs(x)
-        best = ("", 1.0)
-        for scale, sym in prefixes:
-            if absx >= scale and scale >= best[1]:
-                best = (sym, scale)
-        sym, scale = best
-        if sym == "":
-            return f"{x:.3g} {unit}"
-        return f"{x/scale:.3g} {sym}{unit}"
-
     R = float(res.loc[0, "R[Ω]"])
     L = float(res.loc[0, "L[H]"])
     C = float(res.loc[0, "C[F]"])
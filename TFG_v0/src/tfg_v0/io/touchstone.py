@@ -1,6 +1,94 @@
 
+import functools
+
 import skrf as rf
+import numpy as np
 from pathlib import Path
+from types import SimpleNamespace
+
+@functools.lru_cache(maxsize=32)
+def _load_network(path_str: str, mtime_ns: int) -> rf.Network:
+    # mtime_ns en la clave: un archivo regrabado invalida la entrada
+    return rf.Network(path_str)
 
 def load_s2p(path: Path) -> rf.Network:
-    return rf.Network(str(path))
+    """Carga un .s2p como rf.Network, memoizado por (ruta, mtime)."""
+    path = Path(path)
+    return _load_network(str(path), path.stat().st_mtime_ns)
+
+# Caché en memoria del parser ligero, clave (ruta, mtime_ns)
+_S11_CACHE: dict = {}
+
+_FREQ_MULT = {"hz": 1.0, "khz": 1e3, "mhz": 1e6, "ghz": 1e9}
+
+def load_s11_z0(path: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Parser Touchstone mínimo para el camino caliente del CLI.
+
+    rf.Network construye objetos Frequency, metadatos de puertos, etc. que
+    el CLI nunca usa: aquí solo se lee la línea de opciones ('# GHz S MA R 50')
+    y el bloque numérico con np.loadtxt, y se devuelve (f_hz, s11, z0).
+    Los resultados se cachean por (ruta, mtime) para re-ejecuciones.
+    """
+    path = Path(path)
+    key = (str(path), path.stat().st_mtime_ns)
+    hit = _S11_CACHE.get(key)
+    if hit is not None:
+        return hit
+
+    # línea de opciones: unidad de frecuencia, formato (RI/MA/DB) y Z0
+    unit, fmt, z0_ref = "ghz", "ma", 50.0
+    with open(path, "r", errors="ignore") as fh:
+        for line in fh:
+            line = line.strip()
+            if line.startswith("#"):
+                toks = line[1:].split()
+                low = [t.lower() for t in toks]
+                for t in low:
+                    if t in _FREQ_MULT:
+                        unit = t
+                    elif t in ("ri", "ma", "db"):
+                        fmt = t
+                if "r" in low:
+                    try:
+                        z0_ref = float(toks[low.index("r") + 1])
+                    except (IndexError, ValueError):
+                        pass
+                break
+
+    data = np.loadtxt(path, comments=("!", "#"), ndmin=2)
+    f = data[:, 0] * _FREQ_MULT[unit]
+    c1, c2 = data[:, 1], data[:, 2]
+    if fmt == "ri":
+        s11 = c1 + 1j * c2
+    elif fmt == "ma":
+        s11 = c1 * np.exp(1j * np.radians(c2))
+    else:  # db
+        s11 = 10 ** (c1 / 20) * np.exp(1j * np.radians(c2))
+    z0 = np.full(f.size, z0_ref, dtype=np.complex128)
+
+    _S11_CACHE[key] = (f, s11, z0)
+    return f, s11, z0
+
+def load_s2p_cached(path: Path):
+    """Carga un .s2p cacheando los arrays parseados en un .npz al lado.
+
+    El parser Touchstone de skrf tokeniza ASCII en cada carga; para lotes que
+    se re-ejecutan sobre el mismo data/raw, el .npz (clave mtime+tamaño) evita
+    re-parsear. Devuelve un objeto con .f, .s y .z0 (suficiente para el fit).
+    """
+    st = path.stat()
+    key = f"{st.st_mtime_ns}_{st.st_size}"
+    side = path.with_suffix(".s2p.npz")
+    if side.exists():
+        try:
+            data = np.load(side, allow_pickle=False)
+            if str(data["key"]) == key:
+                return SimpleNamespace(f=data["f"], s=data["s"], z0=data["z0"])
+        except Exception:
+            pass  # caché corrupta/incompatible → re-parsear
+    ntw = rf.Network(str(path))
+    try:
+        np.savez(side, f=ntw.f, s=ntw.s, z0=ntw.z0, key=key)
+    except OSError:
+        pass  # directorio de solo lectura: seguimos sin caché
+    return ntw
@@ -3,6 +3,25 @@ import pandas as pd
 import skrf as rf
 from scipy.optimize import least_squares
 
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:  # numba es opcional: sin él se usa la ruta NumPy
+    _HAS_NUMBA = False
+
+if _HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _resid_abs_nb(R, L, C, w, s_re, s_im, out):
+        """|S11_modelo − S11| en una sola pasada, sin temporales complejos."""
+        for i in range(w.size):
+            zi = w[i] * L - 1.0 / (w[i] * C)
+            num_re = R - 50.0
+            den_re = R + 50.0
+            d = den_re * den_re + zi * zi
+            g_re = (num_re * den_re + zi * zi) / d - s_re[i]
+            g_im = (zi * den_re - num_re * zi) / d - s_im[i]
+            out[i] = np.sqrt(g_re * g_re + g_im * g_im)
+
 def fit_equivalent(ntw: rf.Network, cfg) -> pd.DataFrame:
     """
     Ajusta un modelo RLC simple (serie o paralelo) alrededor de la frecuencia central.
@@ -18,20 +37,87 @@ def fit_equivalent(ntw: rf.Network, cfg) -> pd.DataFrame:
     mask = (f > f0 - bw/2) & (f < f0 + bw/2)
     f_fit, s11_fit = f[mask], s11[mask]
 
-    # función modelo
+    # función modelo (numexpr fusiona la expresión compleja en una sola
+    # pasada multihilo, sin los temporales intermedios de NumPy)
     def s11_model(params, f):
         R, L, C = params
         w = 2*np.pi*f
-        Z = R + 1j*(w*L - 1/(w*C))
-        return (Z - 50)/(Z + 50)
+        try:
+            import numexpr as ne
+            return ne.evaluate(
+                "(R + 1j*(w*L - 1/(w*C)) - 50) / (R + 1j*(w*L - 1/(w*C)) + 50)"
+            )
+        except ImportError:
+            Z = R + 1j*(w*L - 1/(w*C))
+            return (Z - 50)/(Z + 50)
+
+    if _HAS_NUMBA:
+        w_fit = np.ascontiguousarray(2 * np.pi * f_fit, dtype=np.float64)
+        s_re = np.ascontiguousarray(s11_fit.real, dtype=np.float64)
+        s_im = np.ascontiguousarray(s11_fit.imag, dtype=np.float64)
+
+        def residuals(params):
+            out = np.empty(w_fit.size)
+            _resid_abs_nb(params[0], params[1], params[2], w_fit, s_re, s_im, out)
+            return out
+    else:
+        def residuals(params):
+            return np.abs(s11_model(params, f_fit) - s11_fit)
 
-    def residuals(params):
-        return np.abs(s11_model(params, f_fit) - s11_fit)
+    def jac(params):
+        # Jacobiano analítico del residuo |Γ−S11|: dΓ/dZ = 2·50/(Z+50)²
+        # y d|g|/dp = Re(conj(g)·dΓ/dp)/|g|. Ahorra las evaluaciones
+        # numéricas de jac='2-point' en cada paso del optimizador.
+        R, L, C = params
+        w = 2 * np.pi * f_fit
+        Z = R + 1j * (w * L - 1 / (w * C))
+        g = (Z - 50) / (Z + 50) - s11_fit
+        dG_dR = 100.0 / (Z + 50) ** 2
+        dG_dL = dG_dR * (1j * w)
+        dG_dC = dG_dR * (1j / (w * C * C))
+        u = np.conj(g) / np.maximum(np.abs(g), 1e-15)
+        return np.c_[(u * dG_dR).real, (u * dG_dL).real, (u * dG_dC).real]
+
+    # Reparametrización logarítmica: q = log([R,L,C]) mantiene la
+    # positividad sin bounds y permite method='lm', que para 3 parámetros
+    # converge con menos evaluaciones del residuo que TRF acotado
+    # el clip evita que un paso de prueba extremo de LM desborde exp()
+    # a 0/inf (C = 0 dividiría por cero dentro del residuo)
+    def residuals_log(q):
+        return residuals(np.exp(np.clip(q, -700.0, 700.0)))
+
+    def jac_log(q):
+        p = np.exp(np.clip(q, -700.0, 700.0))
+        return jac(p) * p  # regla de la cadena
 
-    x0 = [cfg.model.initial.R, cfg.model.initial.L, cfg.model.initial.C]
-    res = least_squares(residuals, x0, bounds=(0, np.inf))
+    q0 = np.log([cfg.model.initial.R, cfg.model.initial.L, cfg.model.initial.C])
+    # LM exige al menos tantos residuos como parámetros; con ventanas muy
+    # estrechas (menos de 3 puntos en banda) se recae a TRF sobre la misma
+    # reparametrización logarítmica
+    method = "lm" if f_fit.size >= q0.size else "trf"
+    res = least_squares(residuals_log, q0, jac=jac_log, method=method,
+                        xtol=1e-10, ftol=1e-10, max_nfev=200)
 
-    R, L, C = res.x
+    R, L, C = np.exp(res.x)
     df = pd.DataFrame([{"R[Ω]": R, "L[H]": L, "C[F]": C}])
 
+    # El S11 del modelo sobre todo el eje de frecuencias se evalúa aquí una
+    # sola vez y se adjunta en df.attrs: el CLI lo reutiliza para graficar
+    # en vez de repetir la misma división compleja de N puntos.
+    z0_arr = getattr(ntw, "z0", None)
+    if z0_arr is not None:
+        z0_1 = z0_arr[:, 0] if getattr(z0_arr, "ndim", 1) > 1 else z0_arr
+    else:
+        z0_1 = np.full(f.size, 50.0)
+    w = 2*np.pi*f
+    try:
+        import numexpr as ne
+        s11_full = ne.evaluate(
+            "(R + 1j*(w*L - 1/(w*C)) - z0_1) / (R + 1j*(w*L - 1/(w*C)) + z0_1)"
+        )
+    except ImportError:
+        Z = R + 1j*(w*L - 1/(w*C))
+        s11_full = (Z - z0_1)/(Z + z0_1)
+    df.attrs["s11_model"] = s11_full
+
     return df
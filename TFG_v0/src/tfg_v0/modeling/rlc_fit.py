@@ -2,52 +2,231 @@
 import numpy as np
 import pandas as pd
 from scipy.optimize import least_squares
+from scipy.sparse import coo_matrix
 import skrf as rf
 from .rlc_equiv import z_rlc_series
 
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:  # numba es opcional: sin él se usa la ruta NumPy
+    _HAS_NUMBA = False
+
+if _HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _resid_rlc_nb(R, L, C, w, z0_re, z0_im, s_re, s_im, out):
+        """Residuo [Re(Γ−S11); Im(Γ−S11)] fusionado en una sola pasada.
+
+        least_squares evalúa el residuo decenas de veces por ajuste; la
+        versión NumPy encadena varios ufuncs con sus temporales. Aquí la
+        impedancia, la división compleja y la resta se hacen punto a punto
+        sin reservar arrays intermedios.
+        """
+        n = w.size
+        for i in range(n):
+            zi = w[i] * L - 1.0 / (w[i] * C)
+            num_re = R - z0_re[i]
+            num_im = zi - z0_im[i]
+            den_re = R + z0_re[i]
+            den_im = zi + z0_im[i]
+            d = den_re * den_re + den_im * den_im
+            out[i] = (num_re * den_re + num_im * den_im) / d - s_re[i]
+            out[n + i] = (num_im * den_re - num_re * den_im) / d - s_im[i]
+
 def fit_equivalent(ntw: rf.Network, cfg) -> pd.DataFrame:
     f = ntw.f
     s11 = ntw.s[:, 0, 0]
     z0 = ntw.z0[:, 0]
 
-    def gamma_from_z(z):
-        return (z - z0) / (z + z0)
-
     f0 = cfg.processing.ref_frequency_hz
     bw = cfg.processing.window_band_hz
     mask = (f > f0 - bw / 2) & (f < f0 + bw / 2)
 
-    def resid(p):
+    # Arrays de la banda, contiguos y en float64, extraídos una sola vez
+    f_m = np.ascontiguousarray(f[mask], dtype=np.float64)
+    z0_m = np.ascontiguousarray(z0[mask], dtype=np.complex128)
+    s11_m = np.ascontiguousarray(s11[mask], dtype=np.complex128)
+    w_m = 2 * np.pi * f_m
+
+    if _HAS_NUMBA:
+        z0_re = np.ascontiguousarray(z0_m.real)
+        z0_im = np.ascontiguousarray(z0_m.imag)
+        s_re = np.ascontiguousarray(s11_m.real)
+        s_im = np.ascontiguousarray(s11_m.imag)
+
+        def resid(p):
+            # out por llamada: least_squares guarda referencias al residuo
+            # devuelto, así que un buffer compartido aliasaría su estado
+            out = np.empty(2 * w_m.size)
+            _resid_rlc_nb(p[0], p[1], p[2], w_m, z0_re, z0_im, s_re, s_im, out)
+            return out
+    else:
+        # Buffers de trabajo reservados una sola vez: las ~5 reservas de
+        # arrays complejos por llamada al residuo se sustituyen por ufuncs
+        # in-place sobre estos dos (menos presión sobre el allocator y
+        # working set estable en caché durante todo el ajuste)
+        z_buf = np.empty(w_m.size, dtype=np.complex128)
+        d_buf = np.empty(w_m.size, dtype=np.complex128)
+
+        def resid(p):
+            # w_m ya está precalculado: no se vuelve a derivar 2πf ni a
+            # re-indexar la banda en cada iteración del optimizador
+            R, L, C = p
+            np.multiply(w_m, 1j * L, out=z_buf)         # jωL
+            np.divide(1j / C, w_m, out=d_buf)           # j/(ωC)
+            np.subtract(z_buf, d_buf, out=z_buf)
+            np.add(z_buf, R, out=z_buf)                 # Z = R + j(ωL − 1/(ωC))
+            np.add(z_buf, z0_m, out=d_buf)              # Z + z0
+            np.subtract(z_buf, z0_m, out=z_buf)         # Z − z0
+            np.divide(z_buf, d_buf, out=d_buf)          # Γ
+            np.subtract(d_buf, s11_m, out=d_buf)
+            # la salida sí se reserva por llamada: least_squares retiene
+            # referencias a los residuos devueltos
+            out = np.empty(2 * w_m.size)
+            out[:w_m.size] = d_buf.real
+            out[w_m.size:] = d_buf.imag
+            return out
+
+    def jac(p):
+        # Jacobiano analítico: Γ = (Z−z0)/(Z+z0) ⇒ dΓ/dZ = 2·z0/(Z+z0)²,
+        # con dZ/dR = 1, dZ/dL = jω y dZ/dC = j/(ωC²). Evita las ~3
+        # evaluaciones extra del residuo por paso que cuesta jac='2-point'.
         R, L, C = p
-        z = z_rlc_series(f[mask], R, L, C)
-        g = gamma_from_z(z) - s11[mask]
-        return np.r_[g.real, g.imag]
+        Z = R + 1j * (w_m * L - 1.0 / (w_m * C))
+        dG_dR = 2 * z0_m / (Z + z0_m) ** 2
+        dG_dL = dG_dR * (1j * w_m)
+        dG_dC = dG_dR * (1j / (w_m * C * C))
+        return np.vstack([
+            np.c_[dG_dR.real, dG_dL.real, dG_dC.real],
+            np.c_[dG_dR.imag, dG_dL.imag, dG_dC.imag],
+        ])
+
+    # Reparametrización logarítmica: q = log([R,L,C]) garantiza R,L,C > 0
+    # sin cotas explícitas, lo que habilita method='lm' (LM puro converge
+    # en bastantes menos evaluaciones que TRF con bounds para 3 parámetros)
+    # el clip evita que un paso de prueba extremo de LM desborde exp()
+    # a 0/inf (C = 0 dividiría por cero dentro del residuo)
+    def resid_log(q):
+        return resid(np.exp(np.clip(q, -700.0, 700.0)))
+
+    def jac_log(q):
+        p = np.exp(np.clip(q, -700.0, 700.0))
+        return jac(p) * p  # regla de la cadena: dr/dq_i = dr/dp_i · p_i
 
-    p0 = [cfg.model.initial.R, cfg.model.initial.L, cfg.model.initial.C]
-    lb = [1e-3, 1e-12, 1e-15]
-    ub = [1e3, 1e-6, 1e-9]
-    sol = least_squares(resid, p0, bounds=(lb, ub))
+    q0 = np.log([cfg.model.initial.R, cfg.model.initial.L, cfg.model.initial.C])
+    # LM exige al menos tantos residuos como parámetros (aquí 2 por punto
+    # de banda); con ventanas muy estrechas se recae a TRF sobre la misma
+    # reparametrización logarítmica
+    method = "lm" if 2 * w_m.size >= q0.size else "trf"
+    sol = least_squares(resid_log, q0, jac=jac_log, method=method,
+                        xtol=1e-10, ftol=1e-10, max_nfev=200)
+    R, L, C = np.exp(sol.x)
 
     return pd.DataFrame([{
-        "R[Ω]": sol.x[0],
-        "L[H]": sol.x[1],
-        "C[F]": sol.x[2],
+        "R[Ω]": R,
+        "L[H]": L,
+        "C[F]": C,
         "cost": float(sol.cost)
     }])
+def fit_equivalent_batch(s11: np.ndarray, f: np.ndarray, z0: np.ndarray, cfg) -> np.ndarray:
+    """Ajusta el RLC serie de todo un lote con rejilla de frecuencias común.
+
+    En lugar de N_files optimizaciones independientes se resuelve un único
+    least_squares de 3·N_files parámetros: cada residuo depende solo de los
+    3 parámetros de su archivo, así que el jacobiano es bloque-diagonal (se
+    declara vía jac_sparsity) y el residuo de todo el lote se evalúa en una
+    sola expresión broadcast (N_files, N_freq).
+
+    s11: (N_files, N_freq); f: (N_freq,); z0: (N_files, N_freq).
+    Devuelve un array (N_files, 3) con columnas R, L, C.
+    """
+    f0 = cfg.processing.ref_frequency_hz
+    bw = cfg.processing.window_band_hz
+    mask = (f > f0 - bw / 2) & (f < f0 + bw / 2)
+
+    w = 2 * np.pi * f[mask]
+    S = np.ascontiguousarray(s11[:, mask])
+    Z0 = np.ascontiguousarray(z0[:, mask])
+    n_files, n_freq = S.shape
+
+    # Misma reparametrización logarítmica que los ajustes por archivo:
+    # q = log(p) iguala las escalas de R (~1e1), L (~1e-10) y C (~1e-11),
+    # con las que TRF sobre los parámetros crudos se estancaba en xtol
+    # devolviendo prácticamente el punto inicial
+    def resid(q):
+        P = np.exp(np.clip(q.reshape(n_files, 3), -700.0, 700.0))
+        R = P[:, 0:1]; L = P[:, 1:2]; C = P[:, 2:3]
+        Z = R + 1j * (w[None, :] * L - 1.0 / (w[None, :] * C))
+        g = (Z - Z0) / (Z + Z0) - S
+        return np.concatenate([g.real.ravel(), g.imag.ravel()])
+
+    # Patrón de dispersión: la fila (archivo i, freq k) solo toca las
+    # columnas 3i..3i+2, tanto en el bloque real como en el imaginario
+    rows = np.arange(n_files * n_freq)
+    file_idx = rows // n_freq
+    rr = np.repeat(np.concatenate([rows, rows + n_files * n_freq]), 3)
+    cc = np.repeat(np.concatenate([file_idx, file_idx]), 3) * 3 + np.tile([0, 1, 2], 2 * rows.size)
+    sparsity = coo_matrix(
+        (np.ones(rr.size, dtype=np.uint8), (rr, cc)),
+        shape=(2 * n_files * n_freq, 3 * n_files),
+    )
+
+    q0 = np.tile(np.log([cfg.model.initial.R, cfg.model.initial.L, cfg.model.initial.C]),
+                 n_files)
+    sol = least_squares(resid, q0, jac_sparsity=sparsity,
+                        xtol=1e-10, ftol=1e-10, max_nfev=200)
+
+    return np.exp(sol.x).reshape(n_files, 3)
+
 def gamma_rlc_series(f_hz: np.ndarray, z0: np.ndarray, R: float, L: float, C: float) -> np.ndarray:
     """Γ(f) del RLC en serie con línea de referencia z0(f)."""
     z = z_rlc_series(f_hz, R, L, C)
     return (z - z0) / (z + z0)
 
 
+if _HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _rmse_db_nb(a, b):
+        # una sola pasada: módulo, log10, resta y acumulación por muestra
+        # (la versión NumPy recorre los arrays cuatro veces con temporales)
+        s = 0.0
+        for i in range(a.size):
+            d = 20.0 * (np.log10(np.hypot(a[i].real, a[i].imag))
+                        - np.log10(np.hypot(b[i].real, b[i].imag)))
+            s += d * d
+        return np.sqrt(s / a.size)
+
+    @njit(cache=True, fastmath=True)
+    def _rmse_phase_deg_nb(a, b):
+        # diferencia de fase envuelta: angle(a·conj(b)) por muestra, sin
+        # unwrap secuencial (cada punto es independiente)
+        s = 0.0
+        for i in range(a.size):
+            re = a[i].real * b[i].real + a[i].imag * b[i].imag
+            im = a[i].imag * b[i].real - a[i].real * b[i].imag
+            d = np.arctan2(im, re)
+            s += d * d
+        return np.degrees(np.sqrt(s / a.size))
+
+
 def rmse_db(a: np.ndarray, b: np.ndarray) -> float:
     """Error cuadrático medio entre dos vectores de S11 en dB."""
+    if _HAS_NUMBA and a.size:
+        return float(_rmse_db_nb(np.ascontiguousarray(a, dtype=np.complex128),
+                                 np.ascontiguousarray(b, dtype=np.complex128)))
     a_db = 20 * np.log10(np.abs(a))
     b_db = 20 * np.log10(np.abs(b))
     return float(np.sqrt(np.mean((a_db - b_db) ** 2)))
 
 def rmse_phase_deg(a: np.ndarray, b: np.ndarray) -> float:
-    """Error cuadrático medio de fase (grados)."""
-    a_ph = np.unwrap(np.angle(a)) * 180 / np.pi
-    b_ph = np.unwrap(np.angle(b)) * 180 / np.pi
-    return float(np.sqrt(np.mean((a_ph - b_ph) ** 2)))
+    """Error cuadrático medio de la diferencia de fase envuelta (grados).
+
+    angle(a·conj(b)) da la diferencia punto a punto ya en (−π, π], así que
+    no hace falta el unwrap secuencial (dependiente de datos, no
+    vectorizable) que se aplicaba antes a cada señal por separado.
+    """
+    if _HAS_NUMBA and a.size:
+        return float(_rmse_phase_deg_nb(np.ascontiguousarray(a, dtype=np.complex128),
+                                        np.ascontiguousarray(b, dtype=np.complex128)))
+    d = np.angle(a * np.conj(b))
+    return float(np.degrees(np.sqrt(np.mean(d * d))))
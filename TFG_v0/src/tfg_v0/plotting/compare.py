@@ -1,41 +1,61 @@
-# src/tfg_v0/plotting/compare.py
-from pathlib import Path
-import numpy as np
-import matplotlib.pyplot as plt
-
-def _db(x: np.ndarray) -> np.ndarray:
-    return 20 * np.log10(np.abs(x))
-
-def _phase_deg(x: np.ndarray) -> np.ndarray:
-    return np.unwrap(np.angle(x)) * 180 / np.pi
-
-def plot_s11_meas_vs_model(
-    f_hz: np.ndarray,
-    s11_meas: np.ndarray,
-    s11_model: np.ndarray,
-    outdir: Path,
-    stem: str,
-):
-    outdir.mkdir(parents=True, exist_ok=True)
-
-    # Magnitud
-    plt.figure()
-    plt.plot(f_hz/1e9, _db(s11_meas), label="|S11| medido [dB]")
-    plt.plot(f_hz/1e9, _db(s11_model), linestyle="--", label="|S11| modelo [dB]")
-    plt.xlabel("Frecuencia [GHz]"); plt.ylabel("|S11| [dB]")
-    plt.title("Comparación |S11| medido vs modelo")
-    plt.grid(True); plt.legend()
-    mag_path = outdir / f"{stem}_S11_mag.png"
-    plt.savefig(mag_path, dpi=180, bbox_inches="tight"); plt.close()
-
-    # Fase
-    plt.figure()
-    plt.plot(f_hz/1e9, _phase_deg(s11_meas), label="∠S11 medido [°]")
-    plt.plot(f_hz/1e9, _phase_deg(s11_model), linestyle="--", label="∠S11 modelo [°]")
-    plt.xlabel("Frecuencia [GHz]"); plt.ylabel("Fase [°]")
-    plt.title("Comparación fase S11 medido vs modelo")
-    plt.grid(True); plt.legend()
-    ph_path = outdir / f"{stem}_S11_phase.png"
-    plt.savefig(ph_path, dpi=180, bbox_inches="tight"); plt.close()
-
-    return mag_path, ph_path
+# src/tfg_v0/plotting/compare.py
+from pathlib import Path
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # render directo a PNG, sin GUI ni bucle de eventos
+import matplotlib.pyplot as plt
+
+def _db_phase_deg(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """dB y fase en grados de una sola vez (un solo recorrido del complejo)."""
+    db = 20 * np.log10(np.abs(x))
+    ph = np.unwrap(np.angle(x)) * 180 / np.pi
+    return db, ph
+
+# Figura única reutilizada entre llamadas: crear Figure/Canvas y los ejes en
+# cada plot domina el coste cuando se generan muchos PNG pequeños.
+_FIG = None
+_AX = None
+
+def _get_fig():
+    global _FIG, _AX
+    if _FIG is None:
+        _FIG, _AX = plt.subplots(dpi=110)
+    return _FIG, _AX
+
+def plot_s11_meas_vs_model(
+    f_hz: np.ndarray,
+    s11_meas: np.ndarray,
+    s11_model: np.ndarray,
+    outdir: Path,
+    stem: str,
+):
+    outdir.mkdir(parents=True, exist_ok=True)
+    fig, ax = _get_fig()
+    f_ghz = f_hz / 1e9
+
+    # dB y fase de cada señal se derivan una sola vez y se comparten entre
+    # las dos figuras (antes cada curva repetía abs/angle sobre el complejo)
+    meas_db, meas_ph = _db_phase_deg(s11_meas)
+    model_db, model_ph = _db_phase_deg(s11_model)
+
+    # Magnitud (rasterized: las líneas se rasterizan una vez al guardar)
+    ax.clear()
+    ax.plot(f_ghz, meas_db, label="|S11| medido [dB]", rasterized=True)
+    ax.plot(f_ghz, model_db, linestyle="--", label="|S11| modelo [dB]", rasterized=True)
+    ax.set_xlabel("Frecuencia [GHz]"); ax.set_ylabel("|S11| [dB]")
+    ax.set_title("Comparación |S11| medido vs modelo")
+    ax.grid(True); ax.legend()
+    mag_path = outdir / f"{stem}_S11_mag.png"
+    fig.savefig(mag_path, dpi=110)
+
+    # Fase
+    ax.clear()
+    ax.plot(f_ghz, meas_ph, label="∠S11 medido [°]", rasterized=True)
+    ax.plot(f_ghz, model_ph, linestyle="--", label="∠S11 modelo [°]", rasterized=True)
+    ax.set_xlabel("Frecuencia [GHz]"); ax.set_ylabel("Fase [°]")
+    ax.set_title("Comparación fase S11 medido vs modelo")
+    ax.grid(True); ax.legend()
+    ph_path = outdir / f"{stem}_S11_phase.png"
+    fig.savefig(ph_path, dpi=110)
+
+    return mag_path, ph_path
@@ -1,6 +1,9 @@
 
+import numpy as np
 import skrf as rf
-from tfg_v0.modeling.rlc_fit import fit_equivalent
+from pathlib import Path
+from tfg_v0.model import fit_equivalent as fit_equivalent_single
+from tfg_v0.modeling.rlc_fit import fit_equivalent, fit_equivalent_batch
 from types import SimpleNamespace
 
 def test_fit_equivalent_runs():
@@ -11,3 +14,52 @@ def test_fit_equivalent_runs():
     )
     df = fit_equivalent(ntw, cfg)
     assert {"R[Ω]", "L[H]", "C[F]"}.issubset(df.columns)
+
+def test_fit_narrow_window():
+    # Regresión: con menos de 3 puntos en banda, method='lm' lanza
+    # ValueError (m < n); ambos ajustadores deben recaer a TRF y devolver
+    # parámetros positivos, como hacía el ajuste acotado original
+    f = np.array([1e9, 1.5e9, 2e9])
+    s11 = np.full(3, -0.5 + 0.1j)
+    ntw = SimpleNamespace(f=f, s=s11.reshape(3, 1, 1),
+                          z0=np.full((3, 1), 50 + 0j))
+    cfg = SimpleNamespace(
+        processing=SimpleNamespace(ref_frequency_hz=1.5e9, window_band_hz=2e8),
+        model=SimpleNamespace(initial=SimpleNamespace(R=10.0, L=1e-9, C=1e-10))
+    )
+    for fit in (fit_equivalent_single, fit_equivalent):
+        df = fit(ntw, cfg)
+        vals = df[["R[Ω]", "L[H]", "C[F]"]].to_numpy()[0]
+        assert np.all(np.isfinite(vals)) and np.all(vals > 0)
+
+def test_batch_matches_per_file():
+    # Paridad entre las dos rutas de batch_fit: el ajuste vectorizado por
+    # lote (rejilla común) debe dar los mismos R/L/C que los ajustes por
+    # archivo sobre los mismos datos
+    rng = np.random.default_rng(42)
+    n = 200
+    f = np.linspace(1e9, 3e9, n)
+    w = 2 * np.pi * f
+    cfg = SimpleNamespace(
+        processing=SimpleNamespace(ref_frequency_hz=2e9, window_band_hz=2e9),
+        model=SimpleNamespace(initial=SimpleNamespace(R=10.0, L=1e-9, C=1e-10))
+    )
+    z0 = np.full((n, 1), 50 + 0j)
+
+    truths = [(25.0, 5e-10, 3e-11), (60.0, 2e-10, 8e-11)]
+    s11_rows, refs = [], []
+    for R, L, C in truths:
+        z = R + 1j * (w * L - 1 / (w * C))
+        s11 = (z - 50) / (z + 50) + 0.005 * rng.standard_normal(n)
+        s11_rows.append(s11)
+        ntw = SimpleNamespace(f=f, s=s11.reshape(n, 1, 1), z0=z0)
+        df = fit_equivalent_single(ntw, cfg)
+        refs.append(df[["R[Ω]", "L[H]", "C[F]"]].to_numpy()[0])
+
+    out = fit_equivalent_batch(np.vstack(s11_rows), f,
+                               np.tile(z0[:, 0], (2, 1)), cfg)
+    # mismas soluciones que por archivo (residuos re/im vs |g|: tolerancia
+    # holgada pero órdenes de magnitud por debajo del fallo que motivó esto)
+    assert np.allclose(out, np.array(refs), rtol=5e-2)
+    # y ambos recuperan los parámetros verdaderos
+    assert np.allclose(out, np.array(truths), rtol=5e-2)